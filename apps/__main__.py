@@ -37,3 +37,16 @@ def view(input_file, plane, backend):
     if backend == 'matplotlib':
         import matplotlib.pyplot as plt
         plt.show()
+
+
+@cli.command()
+@click.argument('output_file')
+@click.argument('shard_outputs', nargs=-1, required=True)
+def merge(output_file, shard_outputs):
+    '''Merge the outputs of the shards of a morph_stats or morph_check run
+
+    The SHARD_OUTPUTS must be given in the order of their shards, and have the same
+    format as OUTPUT_FILE.
+    '''
+    from neurom.apps.shard import merge_outputs
+    merge_outputs(output_file, shard_outputs)
@@ -173,3 +173,11 @@ class TimeChecks:
 
     def time_has_no_fat_ends(self):
         nc.has_no_fat_ends(self.neuron, multiple_of_mean=2.0, final_point_count=5)
+
+
+class TimeImport:
+    def timeraw_import_neurom(self):
+        return 'import neurom'
+
+    def timeraw_import_check_runner(self):
+        return 'import neurom.check.runner'
@@ -59,7 +59,7 @@ Examples:
 '''
 
 import logging as _logging
-from .version import VERSION as __version__
+import sys as _sys
 from .core import iter_neurites, iter_sections, graft_neuron, iter_segments, NeuriteType
 from .core.dataformat import COLS
 from .core.types import NEURITES as NEURITE_TYPES
@@ -76,3 +76,13 @@ ANY_NEURITE = NeuriteType.all
 # prevent 'No handlers could be found for logger ...' errors
 # https://pythonhosted.org/logutils/libraries.html
 _logging.getLogger(__name__).addHandler(_logging.NullHandler())
+
+if _sys.version_info >= (3, 7):
+    def __getattr__(name):
+        '''Get the version on first access, pkg_resources being slow to import'''
+        if name == '__version__':
+            from .version import VERSION
+            return VERSION
+        raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+else:  # pragma: no cover
+    from .version import VERSION as __version__
@@ -0,0 +1,282 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Process the files of batch applications in worker processes, with limits per file and worker'''
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque, namedtuple
+from functools import partial
+from itertools import count as count_from
+
+from neurom.exceptions import FileProcessingError
+
+L = logging.getLogger(__name__)
+
+# how often the workers are checked for timeouts, in seconds
+POLL_INTERVAL = 0.1
+
+try:
+    from multiprocessing.connection import wait as _wait
+except ImportError:  # pragma: no cover
+    def _wait(connections, timeout):
+        '''Return the connections ready to be read, polling them until timeout (python 2)'''
+        end = time.time() + timeout
+        while True:
+            ready = [conn for conn in connections if conn.poll()]
+            if ready or time.time() >= end:
+                return ready
+            time.sleep(0.01)
+
+
+def get_rss():
+    '''Resident set size of the current process in bytes, None if it cannot be read'''
+    try:
+        with open('/proc/self/statm') as fd:
+            return int(fd.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def _work(func, tasks, results, max_files, max_rss):
+    '''Worker process loop: apply func to the tasks until None, or until it has to be recycled
+
+    Each result is sent on the results connection as an (index, ok, value, retiring) tuple.
+    '''
+    count = 0
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        index, filename = task
+        try:
+            value, ok = func(filename), True
+        except Exception as e:  # pylint: disable=broad-except
+            value, ok = e, False
+        count += 1
+        rss = get_rss() if max_rss else None
+        retiring = bool((max_files and count >= max_files) or (rss and rss > max_rss))
+        results.send((index, ok, value, retiring))
+        if retiring:
+            return
+
+
+class _RecordsHandler(logging.Handler):
+    '''Log handler keeping the records, made picklable'''
+
+    def __init__(self):
+        super(_RecordsHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def _call_buffering_logs(func, filename):
+    '''Call func on filename, returning its result and the log records it emitted'''
+    root = logging.getLogger()
+    handler, handlers = _RecordsHandler(), root.handlers
+    root.handlers = [handler]
+    try:
+        return func(filename), handler.records
+    finally:
+        root.handlers = handlers
+
+
+_Task = namedtuple('_Task', 'index, filename, start')
+
+
+class _Worker(object):
+    '''A worker process with its task queue, result pipe, and the task it is running
+
+    The queue and the pipe are not shared with other workers, so that killing a worker, e.g.
+    while it sends a result, cannot corrupt the channels of the others.
+    '''
+
+    def __init__(self, func, max_files, max_rss):
+        self.tasks = multiprocessing.Queue()
+        self.results, sender = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=_work, args=(func, self.tasks, sender, max_files, max_rss))
+        self.process.daemon = True
+        self.process.start()
+        # only the worker holds the sending end, so that its exit is seen as EOF
+        sender.close()
+        self.task = None
+
+    def submit(self, index, filename):
+        '''Send a file to the worker'''
+        self.task = _Task(index, filename, time.time())
+        self.tasks.put((index, filename))
+
+    def stop(self):
+        '''Stop the worker, killing it if it is still running'''
+        if self.process.is_alive():
+            if self.task is None:
+                self.tasks.put(None)
+                self.process.join(1)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.process.join()
+        self.results.close()
+
+
+class _FileMap(object):
+    '''Apply a function to files in worker processes, keeping the results until they are got'''
+
+    def __init__(self, func, files, timeout, max_files_per_worker, max_rss):
+        self.func = func
+        self.timeout = timeout
+        self.max_files_per_worker = max_files_per_worker
+        self.max_rss = max_rss
+        self.pending = deque(enumerate(files))
+        self.count = len(self.pending)
+        self.worker_ids = count_from()
+        self.workers = {}
+        self.done = {}
+
+    def start_worker(self):
+        '''Start a worker for the next file, if any'''
+        if self.pending:
+            worker_id = next(self.worker_ids)
+            self.workers[worker_id] = _Worker(self.func, self.max_files_per_worker, self.max_rss)
+            self._submit(worker_id)
+
+    def get(self, index):
+        '''Wait for the result of the file at index and return it'''
+        while index not in self.done:
+            self._receive(block=True)
+            self._check_workers()
+        return self.done.pop(index)
+
+    def stop(self):
+        '''Stop all the workers'''
+        for worker in self.workers.values():
+            worker.stop()
+
+    def _submit(self, worker_id):
+        '''Give the next file to a worker, stop it if there is none'''
+        if self.pending:
+            self.workers[worker_id].submit(*self.pending.popleft())
+        else:
+            self.workers.pop(worker_id).stop()
+
+    def _replace(self, worker_id, error):
+        '''Kill a worker, record the error for its file, and start a new one'''
+        worker = self.workers.pop(worker_id)
+        L.error('File %s failed: %s', worker.task.filename, error)
+        self.done[worker.task.index] = FileProcessingError('%s: %s' %
+                                                           (worker.task.filename, error))
+        worker.stop()
+        self.start_worker()
+
+    def _receive(self, block):
+        '''Process the results sent by the workers, and replace the workers that died
+
+        The result of a file that finished right when its worker was replaced is lost with
+        the pipe of the worker, its error was already recorded.
+        '''
+        while True:
+            connections = dict((worker.results, worker_id)
+                               for worker_id, worker in self.workers.items())
+            ready = _wait(list(connections), POLL_INTERVAL if block else 0)
+            if not ready:
+                return
+            block = False
+            for conn in ready:
+                worker_id = connections[conn]
+                worker = self.workers[worker_id]
+                try:
+                    index, ok, value, retiring = conn.recv()
+                except EOFError:
+                    # the last result of a worker is sent before it exits
+                    worker.process.join()
+                    self._replace(worker_id, 'worker died with exit code %s' %
+                                  worker.process.exitcode)
+                    continue
+                if not ok:
+                    raise value
+                self.done[index] = value
+                worker.task = None
+                if retiring:
+                    self.workers.pop(worker_id).stop()
+                    self.start_worker()
+                else:
+                    self._submit(worker_id)
+
+    def _check_workers(self):
+        '''Replace the workers that are over the time budget'''
+        if self.timeout is None:
+            return
+        for worker_id, worker in list(self.workers.items()):
+            if worker.task is not None and time.time() - worker.task.start > self.timeout:
+                self._replace(worker_id, 'timed out after %s seconds' % self.timeout)
+
+
+def imap_files(func, files, jobs=1, timeout=None, max_files_per_worker=None, max_rss=None,
+               buffer_logs=False):
+    '''Apply func to each file in worker processes, and yield the results in the order of files
+
+    Parameters:
+        func: picklable function of a file name
+        files: list of file names
+        jobs(int): number of worker processes
+        timeout(float): wall-clock time budget of a file, in seconds. The worker processing a
+            file for longer is killed and replaced, without affecting the other workers.
+        max_files_per_worker(int): number of files after which a worker is replaced
+        max_rss(int): resident memory, in bytes, above which a worker is replaced after its
+            current file, so that leaks, e.g. of caches, do not accumulate
+        buffer_logs(bool): if True, the log records of a file are kept by its worker and
+            emitted by the current process with its result, so that the logs of the files
+            are not interleaved
+
+    Returns:
+        generator of the results. The result of a file that timed out or whose worker died is
+        a FileProcessingError instance. The exceptions raised by func are raised again.
+    '''
+    if buffer_logs:
+        func = partial(_call_buffering_logs, func)
+    file_map = _FileMap(func, files, timeout, max_files_per_worker, max_rss)
+    try:
+        for _ in range(jobs):
+            file_map.start_worker()
+        for index in range(file_map.count):
+            result = file_map.get(index)
+            if buffer_logs and not isinstance(result, FileProcessingError):
+                result, records = result
+                for record in records:
+                    logging.getLogger(record.name).handle(record)
+            yield result
+    finally:
+        file_map.stop()
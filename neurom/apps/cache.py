@@ -0,0 +1,134 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Content-addressed cache of the results of batch applications'''
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+
+from future.moves.collections import OrderedDict
+
+from neurom.apps.journal import config_hash
+from neurom.utils import NeuromJSON
+
+L = logging.getLogger(__name__)
+
+# number of added results after which they are committed to the database
+COMMIT_INTERVAL = 1000
+
+
+def content_hash(path, chunk_size=1 << 20):
+    '''SHA1 of the content of a file'''
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(chunk_size), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+class ResultCache(object):
+    '''Cache of the results of files, keyed by the hash of their content and of the configuration
+
+    The results are found again for files with the same content, even if they were moved or
+    touched. The hash of a file is itself cached with its size and modification time, so that
+    unchanged files are not read again.
+
+    Arguments:
+        filename: path of the SQLite database of the cache, created if it does not exist
+        config: configuration of the run, results of other configurations are not used
+        refresh(bool): if True, no result is read from the cache, but the new results
+            replace the cached ones
+
+    Note:
+        results must be JSON serializable, and are read back with JSON types
+    '''
+
+    def __init__(self, filename, config, refresh=False):
+        self.filename = filename
+        self.refresh = refresh
+        self._config = config_hash(config)
+        self._db = sqlite3.connect(filename)
+        self._db.execute('CREATE TABLE IF NOT EXISTS files '
+                         '(path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results '
+                         '(hash TEXT, config TEXT, result TEXT, PRIMARY KEY (hash, config))')
+        self._uncommitted = 0
+
+    def _hash(self, path):
+        '''Content hash of a file, computed again only if its size or mtime changed'''
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self._db.execute('SELECT size, mtime, hash FROM files WHERE path = ?',
+                               (path, )).fetchone()
+        if row is not None and tuple(row[:2]) == (stat.st_size, stat.st_mtime):
+            return row[2]
+        digest = content_hash(path)
+        self._db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                         (path, stat.st_size, stat.st_mtime, digest))
+        self._count_change()
+        return digest
+
+    def _count_change(self):
+        '''Commit the changes every COMMIT_INTERVAL changes'''
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_INTERVAL:
+            self.commit()
+
+    def get(self, path, default=None):
+        '''Cached result of a file, default if there is none'''
+        if self.refresh:
+            return default
+        row = self._db.execute('SELECT result FROM results WHERE hash = ? AND config = ?',
+                               (self._hash(path), self._config)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0], object_pairs_hook=OrderedDict)
+
+    def add(self, path, result):
+        '''Cache the result of a file'''
+        self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                         (self._hash(path), self._config, json.dumps(result, cls=NeuromJSON)))
+        self._count_change()
+
+    def commit(self):
+        '''Write the pending changes to the database'''
+        self._db.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        '''Commit the pending changes and close the database'''
+        self.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,137 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''On-disk journal of the files processed by an application, to resume interrupted runs'''
+import hashlib
+import json
+import logging
+import os
+
+from future.moves.collections import OrderedDict
+
+from neurom.utils import NeuromJSON
+
+L = logging.getLogger(__name__)
+
+
+def config_hash(config):
+    '''Hash of a configuration, independent of the order of its keys'''
+    dump = json.dumps(config, sort_keys=True, cls=NeuromJSON)
+    return hashlib.sha1(dump.encode('utf-8')).hexdigest()
+
+
+class Journal(object):
+    '''Journal of the results of processed files
+
+    Each result is appended as a line of JSON to the journal file, and flushed, as soon as it is
+    added, so that the journal holds every completed file if the run is interrupted. A result is
+    found again only if its file has the same path, size and modification time, and if it was
+    computed with the same configuration. Lines truncated by a crash are ignored.
+
+    Only the position of the line of each file is kept in memory, its result is read back from
+    the journal file when it is looked up.
+
+    Arguments:
+        filename: path of the journal file, created if it does not exist
+        config: configuration of the run, results of other configurations are ignored
+
+    Note:
+        results must be JSON serializable, and are read back with JSON types
+    '''
+
+    def __init__(self, filename, config):
+        self.filename = filename
+        self._config = config_hash(config)
+        self._offsets = {}
+        truncated = os.path.exists(filename) and self._load()
+        self._fd = open(filename, 'ab')
+        if truncated:
+            # start the next entry on a line of its own
+            self._fd.write(b'\n')
+        self._reader = open(filename, 'rb')
+
+    def _load(self):
+        '''Index the lines of the matching configuration in the journal file
+
+        Returns:
+            whether the last line of the file is truncated
+        '''
+        offset, line = 0, b''
+        with open(self.filename, 'rb') as fd:
+            for line in fd:
+                entry = self._parse(line)
+                if entry is not None and entry['config'] == self._config:
+                    self._offsets[tuple(entry['key'])] = offset
+                offset += len(line)
+        L.info('Loaded %d results from journal %s', len(self._offsets), self.filename)
+        return bool(line) and not line.endswith(b'\n')
+
+    def _parse(self, line):
+        '''Parse a line of the journal file, None if it is corrupted'''
+        try:
+            return json.loads(line.decode('utf-8'), object_pairs_hook=OrderedDict)
+        except ValueError:
+            L.warning('Ignoring corrupted line in journal %s', self.filename)
+            return None
+
+    @staticmethod
+    def _key(path):
+        '''Identify a file by its path, size and modification time'''
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime
+
+    def __contains__(self, path):
+        return self._key(path) in self._offsets
+
+    def __getitem__(self, path):
+        self._reader.seek(self._offsets[self._key(path)])
+        return self._parse(self._reader.readline())['result']
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def add(self, path, result):
+        '''Record the result of a file'''
+        key = self._key(path)
+        entry = OrderedDict([('key', key), ('config', self._config), ('result', result)])
+        self._fd.seek(0, os.SEEK_END)
+        offset = self._fd.tell()
+        self._fd.write((json.dumps(entry, cls=NeuromJSON) + '\n').encode('utf-8'))
+        self._fd.flush()
+        self._offsets[key] = offset
+
+    def close(self):
+        '''Close the journal file'''
+        self._fd.close()
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -27,12 +27,20 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 '''Core code for morph_stats application'''
+import csv
+import json
 import logging
-from collections import defaultdict
+import os
+from collections import defaultdict, namedtuple
+from functools import partial
+
 import numpy as np
 import neurom as nm
 
-from neurom.exceptions import ConfigError
+from neurom.apps.batch import imap_files
+from neurom.core.types import tree_type_checker as is_type
+from neurom.exceptions import ConfigError, FileProcessingError, NeuroMError
+from neurom.utils import NeuromJSON
 
 L = logging.getLogger(__name__)
 
@@ -71,18 +79,61 @@ def _stat_name(feat_name, stat_mode):
     return '%s_%s' % (stat_mode, feat_name)
 
 
+PlanStep = namedtuple('PlanStep', 'feature, neurite_types, modes')
+
+
+def compile_config(config):
+    '''Compile the neurite section of a configuration into an execution plan
+
+    Returns:
+        list of PlanStep, one per feature, holding the neurite types over which
+        the feature is split and the (mode, stat name) pairs of the statistics
+    '''
+    neurite_types = tuple(_NEURITE_MAP[n] for n in config.get('neurite_type', ()))
+    return [PlanStep(ns, neurite_types, tuple((mode, _stat_name(ns, mode)) for mode in modes))
+            for ns, modes in config['neurite'].items()]
+
+
+def _iter_neurite_type_values(feature, neurons, neurite_types):
+    '''Compute a feature once and split its values per neurite type
+
+    The feature is computed over all the neurites, and the values of each
+    neurite type are selected with a mask over the neurites. The features that
+    cannot be computed per neurite are computed again for each neurite type.
+    '''
+    ragged = nm.get(feature, neurons, ragged=True)
+    per_neurite = ragged.neurite_offsets is not None
+    neurites = list(nm.iter_neurites(neurons)) if per_neurite else []
+    neurite_counts = np.diff(ragged.neurite_offsets) if per_neurite else np.empty(0, np.intp)
+
+    for neurite_type in neurite_types:
+        if neurite_type == nm.ANY_NEURITE:
+            values = ragged.values
+        elif not per_neurite:
+            values = nm.get(feature, neurons, neurite_type=neurite_type)
+        else:
+            type_filter = is_type(neurite_type)
+            # a bool array even without neurites, an empty list would give a float mask
+            mask = np.repeat(np.array([type_filter(n) for n in neurites], dtype=bool),
+                             neurite_counts)
+            values = ragged.values[mask]
+        # keep the type of empty results consistent with nm.get
+        yield neurite_type, values if len(values) else np.array([])
+
+
 def extract_stats(neurons, config):
-    '''Extract stats from neurons'''
+    '''Extract stats from neurons
+
+    Each neurite feature is computed once for all the neurite types, see compile_config.
+    '''
 
     stats = defaultdict(dict)
-    for ns, modes in config['neurite'].items():
-        for n in config['neurite_type']:
-            n = _NEURITE_MAP[n]
-            for mode in modes:
-                stat_name = _stat_name(ns, mode)
-                stat = eval_stats(nm.get(ns, neurons, neurite_type=n), mode)
+    for step in compile_config(config):
+        for n, values in _iter_neurite_type_values(step.feature, neurons, step.neurite_types):
+            for mode, stat_name in step.modes:
+                stat = eval_stats(values, mode)
 
-                if stat is None or not stat.shape:
+                if stat is None or mode == 'raw' or not stat.shape:
                     stats[n.name][stat_name] = stat
                 else:
                     assert stat.shape in ((3, ), ), \
@@ -100,6 +151,81 @@ def extract_stats(neurons, config):
     return stats
 
 
+def _extract_file_stats(filename, config, ignored_exceptions):
+    '''Load the neuron in `filename` and extract its stats
+
+    Returns:
+        tuple of the neuron name and its stats, or None if loading raised one
+        of the ignored exceptions
+    '''
+    try:
+        neuron = nm.load_neuron(filename)
+    except NeuroMError as e:
+        if isinstance(e, ignored_exceptions):
+            L.info('Ignoring exception "%s" for file %s', e, os.path.basename(filename))
+            return None
+        raise
+    return neuron.name, extract_stats(neuron, config)
+
+
+def iter_files_stats(files, config, ignored_exceptions=(), jobs=1, journal=None,
+                     timeout=None, max_files_per_worker=None, max_rss=None):
+    '''Extract the stats of the neurons in `files`, one file at a time
+
+    Parameters:
+        files: list of morphology file names
+        config: morph_stats configuration
+        ignored_exceptions: NeuroMError subclasses for which files are skipped
+        jobs(int): number of worker processes loading the files and extracting
+            their stats, 1 to do everything in the current process
+        journal(neurom.apps.journal.Journal): if given, the stats of the files found in
+            the journal are read from it instead of being extracted again, and the stats
+            of the other files are added to it
+        timeout, max_files_per_worker, max_rss: limits of the worker processes, see
+            neurom.apps.batch.imap_files. If any is set, the files are processed in
+            worker processes even if jobs is 1
+
+    Returns:
+        generator of (neuron name, stats) tuples, in the order of `files`. The files
+        that timed out or killed their worker are skipped, and are not added to the journal
+    '''
+    func = partial(_extract_file_stats, config=config,
+                   ignored_exceptions=tuple(ignored_exceptions))
+    imap = partial(_imap, func, jobs=jobs, timeout=timeout,
+                   max_files_per_worker=max_files_per_worker, max_rss=max_rss)
+    if journal is None:
+        results = imap(files)
+    else:
+        results = _iter_journaled(imap, files, journal)
+    return (tuple(res) for res in results
+            if res is not None and not isinstance(res, FileProcessingError))
+
+
+def _imap(func, files, jobs, timeout, max_files_per_worker, max_rss):
+    '''Map `func` to `files`, in worker processes if jobs is not 1 or if there are limits'''
+    if jobs == 1 and timeout is None and max_files_per_worker is None and max_rss is None:
+        return (func(f) for f in files)
+    return imap_files(func, files, jobs, timeout, max_files_per_worker, max_rss)
+
+
+def _iter_journaled(imap, files, journal):
+    '''Map `imap` to the files missing from the journal, and add their results to it
+
+    The results of the files already in the journal are returned in place, keeping the
+    order of files.
+    '''
+    done = [f in journal for f in files]
+    results = imap([f for f, d in zip(files, done) if not d])
+    for f, d in zip(files, done):
+        if d:
+            yield journal[f]
+        else:
+            res = next(results, None)
+            if not isinstance(res, FileProcessingError):
+                journal.add(f, res)
+            yield res
+
+
 def get_header(results):
     '''Extracts the headers, using the first value in the dict as the template'''
     ret = ['name', ]
@@ -113,19 +239,279 @@ def get_header(results):
     return ret
 
 
+def get_config_header(config):
+    '''Build the header of the results of a configuration, without computing any stats
+
+    The columns are in the same order as the ones returned by get_header.
+    '''
+    ret = ['name', ]
+    for n in config.get('neurite_type', ()):
+        neurite_type = _NEURITE_MAP[n].name
+        for ns, modes in config['neurite'].items():
+            for mode in modes:
+                stat_name = _stat_name(ns, mode)
+                if ns in _COMPOUND_FEATURES and mode != 'raw':
+                    ret.extend('%s:%s_%s' % (neurite_type, stat_name, suffix)
+                               for suffix in 'XYZ')
+                else:
+                    ret.append('%s:%s' % (neurite_type, stat_name))
+
+    for ns, modes in config['neuron'].items():
+        ret.extend(_stat_name(ns, mode) for mode in modes)
+    return ret
+
+
+def _flatten(headers, name, values):
+    '''extract from the results of a neuron the fields in the headers list
+
+    Missing fields, e.g. compound statistics of empty neurites, are None
+    '''
+    row = []
+    for header in headers:
+        if header == 'name':
+            row.append(name)
+        elif ':' in header:
+            neurite_type, metric = header.split(':')
+            row.append(values.get(neurite_type, {}).get(metric))
+        else:
+            row.append(values.get(header))
+    return row
+
+
 def generate_flattened_dict(headers, results):
     '''extract from results the fields in the headers list'''
     for name, values in results.items():
-        row = []
-        for header in headers:
-            if header == 'name':
-                row.append(name)
-            elif ':' in header:
-                neurite_type, metric = header.split(':')
-                row.append(values[neurite_type][metric])
+        yield _flatten(headers, name, values)
+
+
+def write_stream(results, output_file, config):
+    '''Write each (name, stats) result to output_file as soon as it is available
+
+    Nothing but the current result is kept in memory, and the output is flushed
+    after each row, so that it holds all the processed files in case of a crash.
+
+    Parameters:
+        results: iterable of (name, stats) tuples, as returned by iter_files_stats
+        output_file: path of the output file. If it ends in .csv, a row is written
+            per neuron, under a header built from the config. Otherwise, a JSON
+            object {name: stats} is written per line.
+        config: morph_stats configuration
+    '''
+    with open(output_file, 'w') as fd:
+        if output_file.endswith('.csv'):
+            csvwriter = csv.writer(fd)
+            header = get_config_header(config)
+            csvwriter.writerow(header)
+            for name, stats in results:
+                csvwriter.writerow(_flatten(header, name, stats))
+                fd.flush()
+        else:
+            for name, stats in results:
+                fd.write(json.dumps({name: stats}, cls=NeuromJSON) + '\n')
+                fd.flush()
+
+
+def _get_raw_columns(config):
+    '''Map the header of the raw columns of a configuration to the shape of one raw value'''
+    ret = {}
+    for n in config.get('neurite_type', ()):
+        neurite_type = _NEURITE_MAP[n].name
+        for ns, modes in config['neurite'].items():
+            if 'raw' in modes:
+                shape = (3, ) if ns in _COMPOUND_FEATURES else ()
+                ret['%s:%s' % (neurite_type, _stat_name(ns, 'raw'))] = shape
+    for ns, modes in config['neuron'].items():
+        if 'raw' in modes:
+            ret[_stat_name(ns, 'raw')] = ()
+    return ret
+
+
+def _iter_batches(results, header, batch_size):
+    '''Group the flattened results in batches, returned as lists of columns'''
+    batch = []
+    for name, stats in results:
+        batch.append(_flatten(header, name, stats))
+        if len(batch) == batch_size:
+            yield list(zip(*batch))
+            batch = []
+    if batch:
+        yield list(zip(*batch))
+
+
+def _scalar_column(column):
+    '''Convert a column of statistics to a float array, missing values being NaN'''
+    return np.array([np.nan if v is None else v for v in column], dtype=np.float64)
+
+
+def _raw_column(column, shape):
+    '''Convert a column of raw values to a ragged (values, lengths) pair of arrays
+
+    The values of the i-th neuron are values[offsets[i]:offsets[i + 1]], where the
+    offsets are the cumulative sum of the lengths. Missing values are empty.
+    '''
+    values = [np.asarray(v, dtype=np.float64).reshape((-1, ) + shape)
+              for v in column if v is not None]
+    lengths = np.array([0 if v is None else len(v) for v in column], dtype=np.int64)
+    if values:
+        return np.concatenate(values), lengths
+    return np.empty((0, ) + shape), lengths
+
+
+def _column_path(header):
+    '''Path of a column in hierarchical outputs: neurite statistics are grouped by neurite type'''
+    return header.replace(':', '/')
+
+
+def _write_arrow(batches, output_file, header, raw_columns):
+    '''Write the batches to a Parquet or Feather file, one row group or record batch each'''
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise NeuroMError('neurom[arrow] is needed to write %s files. Please install it by '
+                          'doing: pip install neurom[arrow]' % os.path.splitext(output_file)[1])
+
+    def _raw_type(shape):
+        '''arrow type of a raw column'''
+        return pa.list_(pa.list_(pa.float64(), shape[0]) if shape else pa.float64())
+
+    schema = pa.schema([pa.field(h, pa.string() if h == 'name' else
+                                 _raw_type(raw_columns[h]) if h in raw_columns else
+                                 pa.float64())
+                        for h in header])
+
+    writer = (pq.ParquetWriter(output_file, schema) if output_file.endswith('.parquet') else
+              pa.ipc.new_file(output_file, schema))
+    try:
+        for columns in batches:
+            arrays = [_arrow_array(pa, h, column, raw_columns)
+                      for h, column in zip(header, columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    finally:
+        writer.close()
+
+
+def _arrow_array(pa, h, column, raw_columns):
+    '''Convert the column of a batch to an arrow array'''
+    if h == 'name':
+        return pa.array(column, type=pa.string())
+    if h in raw_columns:
+        values, lengths = _raw_column(column, raw_columns[h])
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int32)
+        values = pa.array(values.ravel())
+        if raw_columns[h]:
+            values = pa.FixedSizeListArray.from_arrays(values, raw_columns[h][0])
+        return pa.ListArray.from_arrays(pa.array(offsets), values)
+    return pa.array(_scalar_column(column))
+
+
+def _write_hdf5(batches, output_file, header, raw_columns):
+    '''Write the batches to an HDF5 file, appending each of them to resizable datasets
+
+    Raw columns are stored as a pair of 'values' and 'offsets' datasets.
+    '''
+    import h5py
+
+    def _append(h5file, path, data):
+        '''append data to the dataset at path, creating it if needed'''
+        if path not in h5file:
+            h5file.create_dataset(path, data=data, maxshape=(None, ) + data.shape[1:], chunks=True)
+        else:
+            dataset = h5file[path]
+            size = len(dataset)
+            dataset.resize(size + len(data), axis=0)
+            dataset[size:] = data
+
+    name_dtype = h5py.special_dtype(vlen=str)
+    with h5py.File(output_file, 'w') as h5file:
+        for columns in batches:
+            for h, column in zip(header, columns):
+                path = _column_path(h)
+                if h == 'name':
+                    _append(h5file, path, np.array(column, dtype=name_dtype))
+                elif h in raw_columns:
+                    values, lengths = _raw_column(column, raw_columns[h])
+                    if path not in h5file:
+                        _append(h5file, path + '/offsets', np.zeros(1, dtype=np.int64))
+                    offsets = h5file[path + '/offsets']
+                    _append(h5file, path + '/offsets', offsets[-1] + np.cumsum(lengths))
+                    _append(h5file, path + '/values', values)
+                else:
+                    _append(h5file, path, _scalar_column(column))
+
+
+def _write_npz(batches, output_file, header, raw_columns):
+    '''Write the batches to a NPZ file
+
+    The zip archive holds whole arrays, so the converted batches are concatenated before
+    being written. Raw columns are stored as a pair of 'values' and 'offsets' arrays.
+    '''
+    arrays = defaultdict(list)
+    for columns in batches:
+        for h, column in zip(header, columns):
+            path = _column_path(h)
+            if h == 'name':
+                arrays[path].append(np.array(column, dtype=np.str_))
+            elif h in raw_columns:
+                values, lengths = _raw_column(column, raw_columns[h])
+                arrays[path + '/values'].append(values)
+                arrays[path + '/offsets'].append(lengths)
             else:
-                row.append(values[header])
-        yield row
+                arrays[path].append(_scalar_column(column))
+
+    output = {}
+    for h in header:
+        path = _column_path(h)
+        if h == 'name':
+            output[path] = np.concatenate(arrays[path] or [np.array([], dtype=np.str_)])
+        elif h in raw_columns:
+            lengths = np.concatenate(arrays[path + '/offsets'] or [np.array([], dtype=np.int64)])
+            output[path + '/offsets'] = np.concatenate(([0], np.cumsum(lengths)))
+            output[path + '/values'] = np.concatenate(arrays[path + '/values'] or
+                                                      [np.empty((0, ) + raw_columns[h])])
+        else:
+            output[path] = np.concatenate(arrays[path] or [np.array([])])
+    np.savez(output_file, **output)
+
+
+def write_columnar(results, output_file, config, batch_size=1024):
+    '''Write the (name, stats) results to output_file in a columnar format
+
+    The rows are converted and written in batches of batch_size neurons, so that only a
+    batch of results is kept in memory. Statistics are stored as float64 columns, with NaN for
+    missing values, and raw values as ragged columns instead of strings.
+
+    Parameters:
+        results: iterable of (name, stats) tuples, as returned by iter_files_stats
+        output_file: path of the output file, whose extension sets the format:
+
+            * .parquet, .feather: one row group / record batch per batch, needs pyarrow.
+              Raw values are list columns.
+            * .h5, .hdf5: a resizable dataset per column, neurite statistics being
+              grouped per neurite type, e.g. 'axon/max_section_length'. Raw values are
+              stored as 'values' and 'offsets' datasets, the values of the i-th neuron being
+              values[offsets[i]:offsets[i + 1]].
+            * .npz: arrays named and laid out as the HDF5 datasets
+
+        config: morph_stats configuration
+        batch_size(int): number of neurons per batch
+    '''
+    ext = os.path.splitext(output_file)[1]
+    if ext not in COLUMNAR_FORMATS:
+        raise NeuroMError('Unknown columnar format "%s", must be one of %s' %
+                          (ext, ', '.join(sorted(COLUMNAR_FORMATS))))
+    header = get_config_header(config)
+    batches = _iter_batches(results, header, batch_size)
+    COLUMNAR_FORMATS[ext](batches, output_file, header, _get_raw_columns(config))
+
+
+COLUMNAR_FORMATS = {
+    '.parquet': _write_arrow,
+    '.feather': _write_arrow,
+    '.h5': _write_hdf5,
+    '.hdf5': _write_hdf5,
+    '.npz': _write_npz,
+}
 
 
 _NEURITE_MAP = {
@@ -136,6 +522,10 @@ _NEURITE_MAP = {
 }
 
 
+# neurite features whose values are 3D points: their statistics are split per axis
+_COMPOUND_FEATURES = frozenset(('segment_midpoints', ))
+
+
 def sanitize_config(config):
     '''check that the config has the correct keys, add missing keys if necessary'''
     if 'neurite' in config:
@@ -0,0 +1,275 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Split the files of batch applications into shards, and merge the outputs of the shards'''
+import json
+import logging
+import os
+import re
+from io import open
+
+import numpy as np
+from future.moves.collections import OrderedDict
+
+from neurom.exceptions import NeuroMError
+from neurom.utils import NeuromJSON
+
+L = logging.getLogger(__name__)
+
+
+def parse_shard(shard):
+    '''Parse a 'i/N' shard specification, i being in [1, N]
+
+    Returns:
+        tuple of the index and the count of shards
+    '''
+    match = re.match(r'^(\d+)/(\d+)$', shard.strip())
+    if match is None:
+        raise NeuroMError('Invalid shard "%s", must be "i/N"' % shard)
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise NeuroMError('Invalid shard "%s", i must be between 1 and N' % shard)
+    return index, count
+
+
+def shard_files(files, index, count):
+    '''Select the files of a shard, balanced by file size
+
+    The files are split in `count` contiguous ranges of about the same total size, so that
+    large files are spread over the shards, and the outputs of the shards concatenated in
+    order are the same as the output of a single run over all the files. If there are at
+    least `count` files, no shard is empty.
+
+    Parameters:
+        files: list of file paths, in the same order for all the shards
+        index(int): index of the shard, in [1, count]
+        count(int): number of shards
+
+    Returns:
+        list of the files of the shard, in the order of `files`
+    '''
+    if not files:
+        return []
+    sizes = np.array([os.path.getsize(f) for f in files], dtype=np.float64)
+    if not sizes.sum():
+        sizes[:] = 1.
+    cumulative = np.cumsum(sizes)
+    # a file belongs to the shard holding the middle of its range of bytes
+    shards = ((cumulative - sizes / 2) * count / cumulative[-1]).astype(int)
+    # bounds[i] is the index of the first file of the (i + 1)-th shard
+    bounds = np.searchsorted(shards, np.arange(count + 1))
+    if len(files) >= count:
+        # move the bounds of the shards left empty by large files, keeping them in order
+        offsets = np.arange(count + 1)
+        bounds = np.maximum.accumulate(
+            np.minimum(bounds, len(files) - count + offsets) - offsets) + offsets
+    return list(files[bounds[index - 1]:bounds[index]])
+
+
+def _read_jsonl(input_file):
+    '''Read a JSON lines output of morph_stats or morph_check in the format of a JSON output
+
+    The lines of morph_check are folded into {'files': {file: summary}, 'STATUS': status}. The
+    last line of a run that was interrupted while writing it is ignored.
+    '''
+    results, status = OrderedDict(), None
+    with open(input_file) as fd:
+        for line in fd:
+            try:
+                result = json.loads(line, object_pairs_hook=OrderedDict)
+            except ValueError:
+                L.warning('Ignoring corrupted line in %s', input_file)
+                continue
+            if list(result) == ['STATUS']:
+                status = result['STATUS']
+            else:
+                results.update(result)
+    if status is None:
+        return results
+    return OrderedDict([('files', results), ('STATUS', status)])
+
+
+def _merge_json(output_file, inputs):
+    '''Merge JSON outputs of morph_stats, or of morph_check whose STATUS is recomputed
+
+    JSON lines outputs are folded into the JSON format.
+    '''
+    merged = OrderedDict()
+    for input_file in inputs:
+        if input_file.endswith('.jsonl'):
+            results = _read_jsonl(input_file)
+        else:
+            with open(input_file) as fd:
+                results = json.load(fd, object_pairs_hook=OrderedDict)
+        if set(results) == {'files', 'STATUS'}:
+            merged.setdefault('files', OrderedDict()).update(results['files'])
+            merged['STATUS'] = ('PASS' if merged.get('STATUS', 'PASS') == 'PASS' and
+                                results['STATUS'] == 'PASS' else 'FAIL')
+        else:
+            merged.update(results)
+    with open(output_file, 'w') as fd:
+        if 'STATUS' in merged:
+            json.dump(merged, fd, indent=4)
+        else:
+            json.dump(merged, fd, cls=NeuromJSON)
+
+
+def _merge_lines(output_file, inputs, header):
+    '''Concatenate the lines of text outputs, keeping the first line once if it is a header'''
+    with open(output_file, 'w', newline='') as output:
+        output_header = None
+        for input_file in inputs:
+            with open(input_file, newline='') as fd:
+                if header:
+                    input_header = fd.readline()
+                    if output_header is None:
+                        output_header = input_header
+                        output.write(output_header)
+                    elif input_header != output_header:
+                        raise NeuroMError('Header of %s differs from the one of %s' %
+                                          (input_file, inputs[0]))
+                for line in fd:
+                    output.write(line)
+
+
+def _merge_jsonl(output_file, inputs):
+    '''Concatenate JSON lines outputs, with a single last STATUS line for morph_check ones'''
+    status = None
+    with open(output_file, 'w') as output:
+        for input_file in inputs:
+            with open(input_file) as fd:
+                for line in fd:
+                    if line.startswith('{"STATUS": '):
+                        status = ('PASS' if status in (None, 'PASS') and
+                                  json.loads(line)['STATUS'] == 'PASS' else 'FAIL')
+                    else:
+                        output.write(line)
+        if status is not None:
+            output.write(json.dumps({'STATUS': status}) + '\n')
+
+
+def _merge_arrays(arrays):
+    '''Concatenate the arrays of the shards, shifting the offsets of raw columns
+
+    Parameters:
+        arrays: dict of array name to the list of arrays of each shard
+    '''
+    ret = OrderedDict()
+    for name, shard_arrays in arrays.items():
+        if name.endswith('/offsets'):
+            merged, shift = [shard_arrays[0][:1]], shard_arrays[0][0]
+            for offsets in shard_arrays:
+                merged.append(offsets[1:] - offsets[0] + shift)
+                shift += offsets[-1] - offsets[0]
+            ret[name] = np.concatenate(merged)
+        else:
+            ret[name] = np.concatenate(shard_arrays)
+    return ret
+
+
+def _merge_npz(output_file, inputs):
+    '''Merge the NPZ outputs of morph_stats'''
+    arrays = OrderedDict()
+    for input_file in inputs:
+        with np.load(input_file) as data:
+            for name in data.files:
+                arrays.setdefault(name, []).append(data[name])
+    np.savez(output_file, **_merge_arrays(arrays))
+
+
+def _merge_hdf5(output_file, inputs):
+    '''Merge the HDF5 outputs of morph_stats'''
+    import h5py
+    arrays = OrderedDict()
+    for input_file in inputs:
+        with h5py.File(input_file, 'r') as h5file:
+            h5file.visititems(lambda name, obj: arrays.setdefault(name, []).append(obj[()])
+                              if isinstance(obj, h5py.Dataset) else None)
+    with h5py.File(output_file, 'w') as h5file:
+        for name, data in _merge_arrays(arrays).items():
+            if data.dtype.kind in 'OSU':
+                data = data.astype(h5py.special_dtype(vlen=str))
+            h5file.create_dataset(name, data=data, maxshape=(None, ) + data.shape[1:],
+                                  chunks=True)
+
+
+def _merge_arrow(output_file, inputs):
+    '''Merge the Parquet or Feather outputs of morph_stats, one shard at a time'''
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise NeuroMError('neurom[arrow] is needed to merge %s files. Please install it by '
+                          'doing: pip install neurom[arrow]' % os.path.splitext(output_file)[1])
+    parquet = output_file.endswith('.parquet')
+    writer = None
+    try:
+        for input_file in inputs:
+            table = pq.read_table(input_file) if parquet else feather.read_table(input_file)
+            if writer is None:
+                writer = (pq.ParquetWriter(output_file, table.schema) if parquet else
+                          pa.ipc.new_file(output_file, table.schema))
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_MERGERS = {
+    '.json': _merge_json,
+    '.jsonl': _merge_jsonl,
+    '.csv': lambda output_file, inputs: _merge_lines(output_file, inputs, header=True),
+    '.parquet': _merge_arrow,
+    '.feather': _merge_arrow,
+    '.h5': _merge_hdf5,
+    '.hdf5': _merge_hdf5,
+    '.npz': _merge_npz,
+}
+
+
+def merge_outputs(output_file, inputs):
+    '''Merge the outputs of the shards of a morph_stats or morph_check run
+
+    The result is the output a single run over all the files would have produced, if the
+    inputs are given in the order of their shards. JSON lines outputs can also be merged, or
+    folded if there is a single one, into a JSON output.
+
+    Parameters:
+        output_file: path of the merged output
+        inputs: paths of the outputs of the shards, with the same format as output_file
+    '''
+    ext = os.path.splitext(output_file)[1]
+    if ext not in _MERGERS:
+        raise NeuroMError('Cannot merge "%s" files, format must be one of %s' %
+                          (ext, ', '.join(sorted(_MERGERS))))
+    for input_file in inputs:
+        input_ext = os.path.splitext(input_file)[1]
+        if input_ext != ext and (ext, input_ext) != ('.json', '.jsonl'):
+            raise NeuroMError('Cannot merge %s into a %s file' % (input_file, ext))
+    _MERGERS[ext](output_file, list(inputs))
@@ -0,0 +1,139 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import os
+import time
+
+from nose import tools as nt
+
+from neurom.apps import batch
+from neurom.apps.batch import get_rss, imap_files
+from neurom.exceptions import FileProcessingError
+
+
+def _process(name):
+    if name == 'sleep':
+        time.sleep(60)
+    elif name == 'exit':
+        os._exit(3)  # pylint: disable=protected-access
+    elif name == 'raise':
+        raise ValueError(name)
+    return name, os.getpid()
+
+
+def test_imap_files():
+    files = list('abcdefg')
+    for jobs in (1, 3):
+        res = list(imap_files(_process, files, jobs=jobs))
+        nt.eq_([name for name, _ in res], files)
+        nt.ok_(len(set(pid for _, pid in res)) <= jobs)
+    nt.eq_(list(imap_files(_process, [], jobs=2)), [])
+
+
+def _big(name):
+    return name * 10 ** 6
+
+
+def test_imap_files_big_results():
+    # larger than the buffer of the result pipes
+    res = list(imap_files(_big, list('abcd'), jobs=2, timeout=30))
+    nt.eq_(res, [name * 10 ** 6 for name in 'abcd'])
+
+
+def test_imap_files_recycling():
+    res = list(imap_files(_process, list('abcde'), max_files_per_worker=2))
+    pids = [pid for _, pid in res]
+    nt.eq_(pids[0], pids[1])
+    nt.eq_(len(set(pids)), 3)
+
+    if get_rss() is not None:
+        res = list(imap_files(_process, list('abc'), max_rss=1))
+        nt.eq_(len(set(pid for _, pid in res)), 3)
+
+
+def test_imap_files_failures():
+    start = time.time()
+    res = list(imap_files(_process, ['a', 'sleep', 'b', 'exit', 'c'], jobs=2, timeout=0.5))
+    nt.ok_(time.time() - start < 30)
+    nt.eq_([r[0] for r in (res[0], res[2], res[4])], ['a', 'b', 'c'])
+    nt.ok_(isinstance(res[1], FileProcessingError))
+    nt.ok_('timed out' in str(res[1]))
+    nt.ok_(isinstance(res[3], FileProcessingError))
+    nt.ok_('exit code 3' in str(res[3]))
+
+
+def test_imap_files_result_at_timeout():
+    # the worker sends the result of 'a' right when it is replaced for timing out
+    file_map = batch._FileMap(_process, list('ab'), timeout=None,
+                              max_files_per_worker=None, max_rss=None)
+    try:
+        file_map.start_worker()
+        start = time.time()
+        while not file_map.workers[0].results.poll() and time.time() - start < 30:
+            time.sleep(0.01)
+        file_map.timeout = 0
+        file_map._check_workers()
+        file_map.timeout = None
+        res = file_map.get(0)
+        nt.ok_(isinstance(res, FileProcessingError))
+        nt.ok_('timed out' in str(res))
+        nt.eq_(file_map.get(1)[0], 'b')
+        nt.eq_(file_map.done, {})
+    finally:
+        file_map.stop()
+
+
+@nt.raises(ValueError)
+def test_imap_files_raises():
+    list(imap_files(_process, ['a', 'raise', 'b'], jobs=2))
+
+
+def _log(name):
+    logging.getLogger('neurom.test').warning('file %s', name)
+    try:
+        raise ValueError(name)
+    except ValueError:
+        logging.getLogger('neurom.test').exception('error')
+    return name
+
+
+def test_imap_files_buffer_logs():
+    logger = logging.getLogger('neurom.test')
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    try:
+        res = list(imap_files(_log, list('abcd'), jobs=2, buffer_logs=True))
+    finally:
+        logger.removeHandler(handler)
+    nt.eq_(res, list('abcd'))
+    nt.eq_([r.getMessage() for r in records],
+           ['file a', 'error', 'file b', 'error', 'file c', 'error', 'file d', 'error'])
+    nt.ok_('ValueError: a' in records[1].exc_text)
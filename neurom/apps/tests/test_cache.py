@@ -0,0 +1,89 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import shutil
+import tempfile
+
+from mock import patch
+from nose import tools as nt
+
+from neurom.apps import cache as cache_module
+from neurom.apps.cache import ResultCache, content_hash
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data/swc')
+
+
+def test_content_hash():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        copy = os.path.join(tmp_dir, 'copy.swc')
+        shutil.copy(os.path.join(DATA_PATH, 'Neuron.swc'), copy)
+        nt.eq_(content_hash(copy), content_hash(os.path.join(DATA_PATH, 'Neuron.swc')))
+        nt.eq_(content_hash(copy), content_hash(copy, chunk_size=7))
+        nt.assert_not_equal(content_hash(copy), content_hash(os.path.join(DATA_PATH, 'simple.swc')))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_result_cache():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        files = [os.path.join(tmp_dir, f) for f in ('a.swc', 'b.swc')]
+        for f in files:
+            shutil.copy(os.path.join(DATA_PATH, 'Neuron.swc'), f)
+        db = os.path.join(tmp_dir, 'cache.db')
+
+        with ResultCache(db, {'a': 1}) as cache:
+            nt.eq_(cache.get(files[0]), None)
+            cache.add(files[0], [True, {'x': 1}])
+            nt.eq_(cache.get(files[0]), [True, {'x': 1}])
+
+        with ResultCache(db, {'a': 1}) as cache:
+            # same content, different path
+            nt.eq_(cache.get(files[1]), [True, {'x': 1}])
+            # the hashes of unchanged files are not computed again
+            with patch.object(cache_module, 'content_hash') as mock_hash:
+                nt.eq_(cache.get(files[0]), [True, {'x': 1}])
+                nt.ok_(not mock_hash.called)
+
+        with ResultCache(db, {'a': 2}) as cache:
+            nt.eq_(cache.get(files[0]), None)
+
+        with ResultCache(db, {'a': 1}, refresh=True) as cache:
+            nt.eq_(cache.get(files[0]), None)
+            cache.add(files[0], [False, {}])
+
+        with open(files[0], 'a') as fd:
+            fd.write('\n')
+        with ResultCache(db, {'a': 1}) as cache:
+            nt.eq_(cache.get(files[0]), None)
+            nt.eq_(cache.get(files[1]), [False, {}])
+    finally:
+        shutil.rmtree(tmp_dir)
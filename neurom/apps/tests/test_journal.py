@@ -0,0 +1,106 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import shutil
+import tempfile
+
+from nose import tools as nt
+
+from neurom.apps.journal import Journal, config_hash
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data/swc')
+
+
+def _copy_files(tmp_dir):
+    files = [os.path.join(tmp_dir, f) for f in ('Neuron.swc', 'simple.swc')]
+    for f in files:
+        shutil.copy(os.path.join(DATA_PATH, os.path.basename(f)), f)
+    return files
+
+
+def test_config_hash():
+    nt.eq_(config_hash({'a': 1, 'b': [1, 2]}), config_hash({'b': [1, 2], 'a': 1}))
+    nt.assert_not_equal(config_hash({'a': 1}), config_hash({'a': 2}))
+
+
+def test_journal():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        files = _copy_files(tmp_dir)
+        journal_file = os.path.join(tmp_dir, 'run.journal')
+
+        with Journal(journal_file, {'a': 1}) as journal:
+            nt.ok_(files[0] not in journal)
+            journal.add(files[0], ('Neuron', {'x': 1.5}))
+            journal.add(files[1], None)
+            nt.ok_(files[0] in journal)
+            nt.eq_(journal[files[0]], ['Neuron', {'x': 1.5}])
+
+        with Journal(journal_file, {'a': 1}) as journal:
+            nt.eq_(len(journal), 2)
+            nt.eq_(journal[files[0]], ['Neuron', {'x': 1.5}])
+            nt.eq_(journal[files[1]], None)
+
+        # other configs do not match
+        with Journal(journal_file, {'a': 2}) as journal:
+            nt.eq_(len(journal), 0)
+
+        # modified files do not match
+        with open(files[1], 'a') as fd:
+            fd.write('\n')
+        with Journal(journal_file, {'a': 1}) as journal:
+            nt.ok_(files[0] in journal)
+            nt.ok_(files[1] not in journal)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_journal_truncated_line():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        files = _copy_files(tmp_dir)
+        journal_file = os.path.join(tmp_dir, 'run.journal')
+        with Journal(journal_file, {}) as journal:
+            journal.add(files[0], 1)
+        with open(journal_file, 'a') as fd:
+            fd.write('{"key": ["')
+
+        with Journal(journal_file, {}) as journal:
+            nt.eq_(len(journal), 1)
+            nt.eq_(journal[files[0]], 1)
+            journal.add(files[1], {'x': [1, 2]})
+            nt.eq_(journal[files[1]], {'x': [1, 2]})
+
+        with Journal(journal_file, {}) as journal:
+            nt.eq_(len(journal), 2)
+            nt.eq_(journal[files[0]], 1)
+            nt.eq_(journal[files[1]], {'x': [1, 2]})
+    finally:
+        shutil.rmtree(tmp_dir)
@@ -26,12 +26,20 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import csv
+import json
 import os
+import shutil
+import tempfile
+import time
+from mock import patch
 from nose import tools as nt
 import numpy as np
+from numpy.testing import assert_array_equal
 import neurom as nm
 from neurom.apps import morph_stats as ms
-from neurom.exceptions import ConfigError
+from neurom.apps.journal import Journal
+from neurom.exceptions import ConfigError, NeuroMError, SomaError
 
 _path = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(_path, '../../../test_data/swc')
@@ -136,6 +144,53 @@ def test_extract_stats_single_neuron():
             nt.assert_almost_equal(res[k][kk], REF_OUT[k][kk])
 
 
+def test_compile_config():
+    plan = ms.compile_config(REF_CONFIG)
+    nt.eq_([step.feature for step in plan], list(REF_CONFIG['neurite']))
+    nt.eq_(plan[0].neurite_types,
+           (nm.AXON, nm.APICAL_DENDRITE, nm.BASAL_DENDRITE, nm.ANY_NEURITE))
+    nt.eq_(plan[0].modes, (('max', 'max_section_length'), ('total', 'total_section_length')))
+
+
+def test_extract_stats_matches_get():
+    config = {
+        'neurite': {
+            'section_branch_orders': ['max', 'total'],
+            'number_of_sections': ['total'],
+            'segment_lengths': ['mean', 'std'],
+            'section_areas': ['max', 'total'],
+            'section_tortuosity': ['min'],
+        },
+        'neurite_type': ['AXON', 'APICAL_DENDRITE', 'BASAL_DENDRITE', 'ALL'],
+        'neuron': {},
+    }
+    nrns = nm.load_neurons([os.path.join(DATA_PATH, f)
+                            for f in ('Neuron.swc', 'simple.swc', 'point_soma.swc',
+                                      'Neuron_disconnected_components.swc')])
+    for obj in (nrns[0], nrns[1], nrns[2], nrns[3], nrns):
+        res = ms.extract_stats(obj, config)
+        for neurite_type in config['neurite_type']:
+            neurite_type = ms._NEURITE_MAP[neurite_type]
+            for feature, modes in config['neurite'].items():
+                values = nm.get(feature, obj, neurite_type=neurite_type)
+                for mode in modes:
+                    ref = ms.eval_stats(values, mode)
+                    stat = res[neurite_type.name][ms._stat_name(feature, mode)]
+                    nt.eq_(type(stat), type(ref))
+                    nt.eq_(getattr(stat, 'dtype', None), getattr(ref, 'dtype', None))
+                    assert_array_equal(stat, ref)
+
+
+def test_extract_stats_soma_only():
+    nrn = nm.load_neuron(os.path.join(DATA_PATH, 'point_soma.swc'))
+    nt.eq_(len(nrn.neurites), 0)
+    res = ms.extract_stats(nrn, REF_CONFIG)
+    for k in ('all', 'axon', 'basal_dendrite', 'apical_dendrite'):
+        nt.ok_(res[k]['max_section_length'] is None)
+        nt.eq_(res[k]['total_section_length'], 0)
+        nt.ok_(res[k]['max_segment_midpoint'] is None)
+
+
 def test_get_header():
     fake_results = {'fake_name0': REF_OUT,
                     'fake_name1': REF_OUT,
@@ -147,6 +202,15 @@ def test_get_header():
     nt.ok_('mean_soma_radius' in header)
 
 
+def test_get_config_header():
+    nrn = nm.load_neuron(os.path.join(DATA_PATH, 'Neuron.swc'))
+    header = ms.get_config_header(REF_CONFIG)
+    nt.eq_(header, ms.get_header({'Neuron': ms.extract_stats(nrn, REF_CONFIG)}))
+
+    nt.eq_(ms.get_config_header(ms.sanitize_config({'neuron': {'soma_radii': ['raw']}})),
+           ['name', 'soma_radius'])
+
+
 def test_generate_flattened_dict():
     fake_results = {'fake_name0': REF_OUT,
                     'fake_name1': REF_OUT,
@@ -177,3 +241,192 @@ def test_sanitize_config():
     }
     new_config = ms.sanitize_config(full_config)
     nt.eq_(3, len(new_config)) #neurite, neurite_type & neuron
+
+
+def test_iter_files_stats():
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc', 'Neuron.swc')]
+    serial = list(ms.iter_files_stats(files, REF_CONFIG))
+    nt.eq_([name for name, _ in serial], ['Neuron', 'simple', 'Neuron'])
+    parallel = list(ms.iter_files_stats(files, REF_CONFIG, jobs=2))
+    nt.eq_([name for name, _ in parallel], ['Neuron', 'simple', 'Neuron'])
+    for (_, ref), (_, res) in zip(serial, parallel):
+        nt.eq_(ref['all'], res['all'])
+        nt.eq_(ref['mean_soma_radius'], res['mean_soma_radius'])
+
+
+def test_iter_files_stats_ignored_exceptions():
+    files = [os.path.join(DATA_PATH, f) for f in ('Single_apical_no_soma.swc', 'simple.swc')]
+    nt.assert_raises(SomaError, list, ms.iter_files_stats(files, REF_CONFIG))
+    for jobs in (1, 2):
+        res = list(ms.iter_files_stats(files, REF_CONFIG, ignored_exceptions=(SomaError, ),
+                                       jobs=jobs))
+        nt.eq_([name for name, _ in res], ['simple'])
+
+
+def test_write_stream():
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc')]
+    results = dict(ms.iter_files_stats(files, REF_CONFIG))
+    header = ms.get_config_header(REF_CONFIG)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        output = os.path.join(tmp_dir, 'out.csv')
+        ms.write_stream(ms.iter_files_stats(files, REF_CONFIG), output, REF_CONFIG)
+        with open(output) as fd:
+            rows = list(csv.reader(fd))
+        nt.eq_(rows[0], header)
+        nt.eq_([row[0] for row in rows[1:]], ['Neuron', 'simple'])
+        nt.eq_(len(rows[2]), len(header))
+
+        output = os.path.join(tmp_dir, 'out.jsonl')
+        ms.write_stream(ms.iter_files_stats(files, REF_CONFIG), output, REF_CONFIG)
+        with open(output) as fd:
+            lines = [json.loads(line) for line in fd]
+        nt.eq_(len(lines), 2)
+        nt.eq_(list(lines[1]), ['simple'])
+        nt.assert_almost_equal(lines[0]['Neuron']['all']['total_section_length'],
+                               results['Neuron']['all']['total_section_length'])
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+COLUMNAR_CONFIG = {
+    'neurite': {
+        'section_lengths': ['max', 'raw'],
+        'segment_midpoints': ['raw'],
+    },
+    'neurite_type': ['AXON', 'ALL'],
+    'neuron': {
+        'soma_radii': ['mean'],
+    }
+}
+
+
+def _check_raw(values, offsets, results, name, feature):
+    nt.eq_(offsets[0], 0)
+    for i, nrn in enumerate(['Neuron', 'simple']):
+        assert_array_equal(values[offsets[i]:offsets[i + 1]], results[nrn][name][feature])
+
+
+def test_write_columnar_hdf5():
+    import h5py
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc')]
+    results = dict(ms.iter_files_stats(files, COLUMNAR_CONFIG))
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        output = os.path.join(tmp_dir, 'out.h5')
+        ms.write_columnar(ms.iter_files_stats(files, COLUMNAR_CONFIG), output, COLUMNAR_CONFIG,
+                          batch_size=1)
+        with h5py.File(output, 'r') as h5file:
+            nt.eq_([n.decode() if isinstance(n, bytes) else n for n in h5file['name'][:]],
+                   ['Neuron', 'simple'])
+            assert_array_equal(h5file['axon/max_section_length'][:],
+                               [results[n]['axon']['max_section_length']
+                                for n in ('Neuron', 'simple')])
+            assert_array_equal(h5file['mean_soma_radius'][:],
+                               [results[n]['mean_soma_radius'] for n in ('Neuron', 'simple')])
+            _check_raw(h5file['all/section_length/values'][:],
+                       h5file['all/section_length/offsets'][:], results, 'all', 'section_length')
+            nt.eq_(h5file['all/segment_midpoint/values'].shape[1], 3)
+            _check_raw(h5file['all/segment_midpoint/values'][:],
+                       h5file['all/segment_midpoint/offsets'][:], results, 'all',
+                       'segment_midpoint')
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_write_columnar_npz():
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc')]
+    results = dict(ms.iter_files_stats(files, COLUMNAR_CONFIG))
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        output = os.path.join(tmp_dir, 'out.npz')
+        ms.write_columnar(ms.iter_files_stats(files, COLUMNAR_CONFIG), output, COLUMNAR_CONFIG)
+        with np.load(output) as data:
+            nt.eq_(list(data['name']), ['Neuron', 'simple'])
+            assert_array_equal(data['axon/max_section_length'],
+                               [results[n]['axon']['max_section_length']
+                                for n in ('Neuron', 'simple')])
+            _check_raw(data['axon/section_length/values'], data['axon/section_length/offsets'],
+                       results, 'axon', 'section_length')
+            _check_raw(data['all/segment_midpoint/values'], data['all/segment_midpoint/offsets'],
+                       results, 'all', 'segment_midpoint')
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_write_columnar_arrow():
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc')]
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        _check_write_arrow(files, os.path.join(tmp_dir, 'out.parquet'))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def _check_write_arrow(files, output):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        nt.assert_raises(NeuroMError, ms.write_columnar,
+                         ms.iter_files_stats(files, COLUMNAR_CONFIG), output, COLUMNAR_CONFIG)
+        return
+
+    results = dict(ms.iter_files_stats(files, COLUMNAR_CONFIG))
+    ms.write_columnar(ms.iter_files_stats(files, COLUMNAR_CONFIG), output, COLUMNAR_CONFIG,
+                      batch_size=1)
+    table = pq.read_table(output).to_pydict()
+    nt.eq_(table['name'], ['Neuron', 'simple'])
+    nt.eq_(table['all:section_length'][1], results['simple']['all']['section_length'])
+    nt.eq_(table['all:segment_midpoint'][1], results['simple']['all']['segment_midpoint'])
+
+
+@nt.raises(NeuroMError)
+def test_write_columnar_unknown_format():
+    ms.write_columnar([], 'out.xlsx', COLUMNAR_CONFIG)
+
+
+def test_iter_files_stats_journal():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        files = [os.path.join(tmp_dir, f) for f in ('Neuron.swc', 'simple.swc')]
+        for f in files:
+            shutil.copy(os.path.join(DATA_PATH, os.path.basename(f)), f)
+        journal_file = os.path.join(tmp_dir, 'run.journal')
+        ref = list(ms.iter_files_stats(files, REF_CONFIG))
+
+        with Journal(journal_file, REF_CONFIG) as journal:
+            res = list(ms.iter_files_stats(files[:1], REF_CONFIG, journal=journal))
+            nt.eq_(res, ref[:1])
+
+        with Journal(journal_file, REF_CONFIG) as journal:
+            nt.ok_(files[0] in journal)
+            nt.ok_(files[1] not in journal)
+            res = list(ms.iter_files_stats(files, REF_CONFIG, journal=journal))
+            nt.ok_(files[1] in journal)
+        nt.eq_([name for name, _ in res], ['Neuron', 'simple'])
+        for (_, stats), (_, ref_stats) in zip(res, ref):
+            nt.assert_almost_equal(stats['all']['total_section_length'],
+                                   ref_stats['all']['total_section_length'])
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_iter_files_stats_limits():
+    files = [os.path.join(DATA_PATH, f) for f in ('Neuron.swc', 'simple.swc')]
+    serial = list(ms.iter_files_stats(files, REF_CONFIG))
+    res = list(ms.iter_files_stats(files, REF_CONFIG, max_files_per_worker=1, timeout=60))
+    nt.eq_([name for name, _ in res], ['Neuron', 'simple'])
+    nt.assert_almost_equal(res[0][1]['all']['total_section_length'],
+                           serial[0][1]['all']['total_section_length'])
+
+    # files over their time budget are skipped
+    def _sleep(filename, **kwargs):
+        if filename == files[0]:
+            time.sleep(60)
+        return filename, {}
+    with patch.object(ms, '_extract_file_stats', _sleep):
+        res = list(ms.iter_files_stats(files, REF_CONFIG, timeout=0.5))
+    nt.eq_(res, [(files[1], {})])
@@ -0,0 +1,214 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from nose import tools as nt
+from numpy.testing import assert_array_equal
+
+from neurom.apps import morph_stats as ms
+from neurom.apps.shard import merge_outputs, parse_shard, shard_files
+from neurom.exceptions import NeuroMError
+from neurom.io.utils import get_morph_files
+
+_path = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_path, '../../../test_data/swc')
+
+FILES = [os.path.join(DATA_PATH, f)
+         for f in ('Neuron.swc', 'simple.swc', 'Single_apical.swc', 'Single_axon.swc')]
+
+CONFIG = {
+    'neurite': {
+        'section_lengths': ['max', 'raw'],
+    },
+    'neurite_type': ['AXON', 'ALL'],
+    'neuron': {
+        'soma_radii': ['mean'],
+    }
+}
+
+# temporary directory of the outputs of the tests of this module
+TMP_DIR = None
+
+
+def setup_module():
+    global TMP_DIR  # pylint: disable=global-statement
+    TMP_DIR = tempfile.mkdtemp()
+
+
+def teardown_module():
+    shutil.rmtree(TMP_DIR)
+
+
+def test_parse_shard():
+    nt.eq_(parse_shard('1/4'), (1, 4))
+    nt.eq_(parse_shard(' 4/4'), (4, 4))
+    for shard in ('0/4', '5/4', '1', '1/a', '-1/4'):
+        nt.assert_raises(NeuroMError, parse_shard, shard)
+
+
+def test_shard_files():
+    files = get_morph_files(DATA_PATH)
+    for count in (1, 2, 3, 7):
+        shards = [shard_files(files, i, count) for i in range(1, count + 1)]
+        nt.eq_(sum(shards, []), files)
+
+    shards = [shard_files(files, i, 2) for i in (1, 2)]
+    sizes = [sum(os.path.getsize(f) for f in shard) for shard in shards]
+    nt.ok_(abs(sizes[0] - sizes[1]) <= max(os.path.getsize(f) for f in files))
+    nt.eq_(shard_files([], 1, 2), [])
+
+    # a large file must not leave the following shards empty
+    files = get_morph_files(os.path.join(_path, '../../../test_data/valid_set'))
+    for count in range(1, len(files) + 1):
+        shards = [shard_files(files, i, count) for i in range(1, count + 1)]
+        nt.eq_(sum(shards, []), files)
+        nt.ok_(all(shards))
+
+
+def _write_shards(tmp_dir, ext, write):
+    outputs = []
+    for i in (1, 2):
+        output = os.path.join(tmp_dir, 'shard%d%s' % (i, ext))
+        write(ms.iter_files_stats(shard_files(FILES, i, 2), CONFIG), output)
+        outputs.append(output)
+    full = os.path.join(tmp_dir, 'full' + ext)
+    write(ms.iter_files_stats(FILES, CONFIG), full)
+    merged = os.path.join(tmp_dir, 'merged' + ext)
+    merge_outputs(merged, outputs)
+    return full, merged
+
+
+def test_merge_text():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    for ext in ('.csv', '.jsonl'):
+        full, merged = _write_shards(
+            tmp_dir, ext, lambda results, output: ms.write_stream(results, output, CONFIG))
+        with open(full) as fd1, open(merged) as fd2:
+            nt.eq_(fd1.read(), fd2.read())
+
+
+def test_merge_text_empty_shard():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    outputs = []
+    for i, files in enumerate((FILES[:2], [], FILES[2:])):
+        outputs.append(os.path.join(tmp_dir, 'shard%d.csv' % i))
+        ms.write_stream(ms.iter_files_stats(files, CONFIG), outputs[-1], CONFIG)
+    with open(outputs[1]) as fd:
+        nt.eq_(fd.read().strip(), ','.join(ms.get_config_header(CONFIG)))
+    full = os.path.join(tmp_dir, 'full.csv')
+    ms.write_stream(ms.iter_files_stats(FILES, CONFIG), full, CONFIG)
+    merged = os.path.join(tmp_dir, 'merged.csv')
+    merge_outputs(merged, outputs)
+    with open(full) as fd1, open(merged) as fd2:
+        nt.eq_(fd1.read(), fd2.read())
+
+
+def test_merge_json():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+
+    def _write(results, output):
+        with open(output, 'w') as fd:
+            json.dump(dict(results), fd)
+
+    full, merged = _write_shards(tmp_dir, '.json', _write)
+    with open(full) as fd1, open(merged) as fd2:
+        nt.eq_(json.load(fd1), json.load(fd2))
+
+
+def test_merge_check_summaries():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    outputs = [os.path.join(tmp_dir, f) for f in ('s1.json', 's2.json')]
+    with open(outputs[0], 'w') as fd:
+        json.dump({'files': {'a.swc': {'ALL': True}}, 'STATUS': 'PASS'}, fd)
+    with open(outputs[1], 'w') as fd:
+        json.dump({'files': {'b.swc': {'ALL': False}}, 'STATUS': 'FAIL'}, fd)
+    merged = os.path.join(tmp_dir, 'merged.json')
+    merge_outputs(merged, outputs)
+    with open(merged) as fd:
+        nt.eq_(json.load(fd), {'files': {'a.swc': {'ALL': True}, 'b.swc': {'ALL': False}},
+                               'STATUS': 'FAIL'})
+
+
+def test_merge_check_jsonl_reports():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    outputs = [os.path.join(tmp_dir, f) for f in ('s1.jsonl', 's2.jsonl')]
+    with open(outputs[0], 'w') as fd:
+        fd.write('{"a.swc": {"ALL": true}}\n{"STATUS": "PASS"}\n')
+    with open(outputs[1], 'w') as fd:
+        fd.write('{"b.swc": {"ALL": false}}\n{"STATUS": "FAIL"}\n')
+
+    merged = os.path.join(tmp_dir, 'merged.jsonl')
+    merge_outputs(merged, outputs)
+    with open(merged) as fd:
+        nt.eq_(fd.read(), '{"a.swc": {"ALL": true}}\n{"b.swc": {"ALL": false}}\n'
+                          '{"STATUS": "FAIL"}\n')
+
+    # folded into the JSON format
+    folded = os.path.join(tmp_dir, 'folded.json')
+    merge_outputs(folded, [merged])
+    with open(folded) as fd:
+        nt.eq_(json.load(fd), {'files': {'a.swc': {'ALL': True}, 'b.swc': {'ALL': False}},
+                               'STATUS': 'FAIL'})
+
+    # the line being written when the run was interrupted is ignored
+    with open(outputs[0], 'w') as fd:
+        fd.write('{"a.swc": {"ALL": true}}\n{"b.swc": {"AL')
+    merge_outputs(folded, outputs[:1])
+    with open(folded) as fd:
+        nt.eq_(json.load(fd), {'a.swc': {'ALL': True}})
+
+
+def test_merge_npz():
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    full, merged = _write_shards(
+        tmp_dir, '.npz', lambda results, output: ms.write_columnar(results, output, CONFIG))
+    with np.load(full) as full, np.load(merged) as merged:
+        nt.eq_(sorted(full.files), sorted(merged.files))
+        for name in full.files:
+            assert_array_equal(full[name], merged[name])
+
+
+def test_merge_hdf5():
+    import h5py
+    tmp_dir = tempfile.mkdtemp(dir=TMP_DIR)
+    full, merged = _write_shards(
+        tmp_dir, '.h5', lambda results, output: ms.write_columnar(results, output, CONFIG))
+    with h5py.File(full, 'r') as full, h5py.File(merged, 'r') as merged:
+        for name in ('name', 'axon/max_section_length', 'mean_soma_radius',
+                     'all/section_length/values', 'all/section_length/offsets'):
+            assert_array_equal(full[name][()], merged[name][()])
+
+
+def test_merge_invalid_formats():
+    nt.assert_raises(NeuroMError, merge_outputs, 'out.txt', ['a.txt'])
+    nt.assert_raises(NeuroMError, merge_outputs, 'out.csv', ['a.json'])
@@ -30,11 +30,14 @@
 Python module of NeuroM to check neuronal trees.
 '''
 
+from collections import namedtuple
+from itertools import chain
+
 import numpy as np
+
 from neurom.core.dataformat import COLS
 from neurom import morphmath as mm
-from neurom.morphmath import principal_direction_extent
-from neurom._compat import range, filter
+from neurom._compat import zip
 
 
 def is_monotonic(neurite, tol):
@@ -50,18 +53,22 @@ def is_monotonic(neurite, tol):
         True if neurite monotonic
     '''
 
-    for node in neurite.iter_sections():
-        # check that points in section satisfy monotonicity
-        sec = node.points
-        for point_id in range(len(sec) - 1):
-            if sec[point_id + 1][COLS.R] > sec[point_id][COLS.R] + tol:
-                return False
-        # Check that section boundary points satisfy monotonicity
-        if(node.parent is not None and
-           sec[0][COLS.R] > node.parent.points[-1][COLS.R] + tol):
-            return False
+    sections = list(neurite.iter_sections())
+    radii = [sec.points[:, COLS.R] for sec in sections]
+    offsets = np.cumsum([0] + [len(r) for r in radii])
+    radii = np.concatenate(radii)
 
-    return True
+    # check that points in section satisfy monotonicity
+    increases = radii[1:] > radii[:-1] + tol
+    # the first points of the sections are compared to their parents' last points below
+    increases[offsets[1:-1] - 1] = False
+    if increases.any():
+        return False
+
+    # Check that section boundary points satisfy monotonicity
+    parent_radii = np.array([np.nan if sec.parent is None else sec.parent.points[-1, COLS.R]
+                             for sec in sections])
+    return not np.any(radii[offsets[:-1]] > parent_radii + tol)
 
 
 def is_flat(neurite, tol, method='tolerance'):
@@ -79,7 +86,7 @@ def is_flat(neurite, tol, method='tolerance'):
     Returns:
         True if neurite is flat
     '''
-    ext = principal_direction_extent(neurite.points[:, COLS.XYZ])
+    ext = neurite.points_extent
 
     assert method in ('tolerance', 'ratio'), "Method must be one of 'tolerance', 'ratio'"
     if method == 'ratio':
@@ -88,23 +95,12 @@ def is_flat(neurite, tol, method='tolerance'):
     return any(ext < float(tol))
 
 
-def is_back_tracking(neurite):
-    ''' Check if a neurite process backtracks to a previous node. Back-tracking takes place
-    when a daughter of a branching process goes back and either overlaps with a previous point, or
-    lies inside the cylindrical volume of the latter.
-
-    Args:
-        neurite(Neurite): neurite to operate on
-
-    Returns:
-        True Under the following scenaria:
-            1. A segment endpoint falls back and overlaps with a previous segment's point
-            2. The geometry of a segment overlaps with a previous one in the section
+def _is_inside_cylinder(seg1, seg2):
+    ''' Checks if seg2 approximately lies within a cylindrical volume of seg1.
+    Two conditions must be satisfied:
+        1. The two segments are not facing the same direction  (seg2 comes back to seg1)
+        2. seg2 is overlaping with seg1
     '''
-    def pair(segs):
-        ''' Pairs the input list into triplets'''
-        return zip(segs, segs[1:])
-
     def coords(node):
         ''' Returns the first three values of the tree that correspond to the x, y, z coordinates'''
         return node[COLS.XYZ]
@@ -113,10 +109,6 @@ def is_back_tracking(neurite):
         ''' Returns maximum radius from the two segment endpoints'''
         return max(seg[0][COLS.R], seg[1][COLS.R])
 
-    def is_not_zero_seg(seg):
-        ''' Returns True if segment has zero length'''
-        return not np.allclose(coords(seg[0]), coords(seg[1]))
-
     def is_in_the_same_verse(seg1, seg2):
         ''' Checks if the vectors face the same direction. This
         is true if their dot product is greater than zero.
@@ -163,28 +155,137 @@ def is_back_tracking(neurite):
         # half of the others length plus a 5% tolerance
         return np.linalg.norm(prj) < 0.55 * np.linalg.norm(S1S2)
 
-    def is_inside_cylinder(seg1, seg2):
-        ''' Checks if seg2 approximately lies within a cylindrical volume of seg1.
-        Two conditions must be satisfied:
-            1. The two segments are not facing the same direction  (seg2 comes back to seg1)
-            2. seg2 is overlaping with seg1
-        '''
-        return not is_in_the_same_verse(seg1, seg2) and is_seg1_overlapping_with_seg2(seg1, seg2)
-
+    return not is_in_the_same_verse(seg1, seg2) and is_seg1_overlapping_with_seg2(seg1, seg2)
+
+
+# sections with fewer segments compare all their pairs of segments, without a KD-tree
+_ALL_PAIRS_MAX_SEGMENTS = 32
+# relative slack of the vectorized tests, whose candidates are confirmed by _is_inside_cylinder
+_SLACK = 1e-9
+
+
+def _candidate_pairs(ends, centers, reach):
+    '''Pairs (i, j), i > j, of the segments whose end point ends[i] is within reach[j] of
+    the center centers[j] of segment j'''
+    n = len(ends)
+    if n <= _ALL_PAIRS_MAX_SEGMENTS:
+        j, i = np.triu_indices(n, 1)
+    else:
+        from scipy.spatial import cKDTree
+        tree = cKDTree(ends)
+        # query the segments by buckets whose reaches are within a factor 2, so that a few
+        # long segments do not widen the query of all the others
+        buckets = np.floor(np.log2(reach / reach.min())).astype(int)
+        j, i = [], []
+        for bucket in np.unique(buckets):
+            ids = np.flatnonzero(buckets == bucket)
+            neighbors = tree.query_ball_point(centers[ids], reach[ids].max())
+            j.append(np.repeat(ids, [len(n_ids) for n_ids in neighbors]))
+            i.append(np.fromiter(chain.from_iterable(neighbors), dtype=int, count=len(j[-1])))
+        i, j = np.concatenate(i), np.concatenate(j)
+        later = i > j
+        i, j = i[later], j[later]
+    near = np.linalg.norm(ends[i] - centers[j], axis=1) <= reach[j]
+    return i[near], j[near]
+
+
+_Segments = namedtuple('_Segments', 'starts, ends, vectors, lengths, centers, radii')
+
+
+def _section_segments(points):
+    '''Start point ids, end points, vectors, lengths, centers and radii of the segments of
+    a section, without the zero length ones'''
+    starts = np.flatnonzero(~np.all(np.isclose(points[:-1, COLS.XYZ], points[1:, COLS.XYZ]),
+                                    axis=1))
+    p0, p1 = points[starts, COLS.XYZ], points[starts + 1, COLS.XYZ]
+    vectors = p1 - p0
+    return _Segments(starts, p1, vectors, np.linalg.norm(vectors, axis=1), 0.5 * (p0 + p1),
+                     np.maximum(points[starts, COLS.R], points[starts + 1, COLS.R]))
+
+
+def _back_tracking_pairs(segs):
+    '''Pairs (seg1, seg2) of segments such that seg1 may back-track into seg2
+
+    The candidate pairs are selected with a KD-tree and tested in batch, with some slack.
+    '''
+    # within the cylinder, the end point of seg1 is at most at 0.55 times the length of seg2
+    # along seg2 and at the sum of the radii across seg2 from its center
+    reach = (1 + _SLACK) * (0.55 * segs.lengths + segs.radii + segs.radii.max())
+    seg1, seg2 = _candidate_pairs(segs.ends, segs.centers, reach)
+
+    # seg1 comes back to seg2
+    dots = np.einsum('ij,ij->i', segs.vectors[seg1], segs.vectors[seg2])
+    keep = dots < _SLACK * segs.lengths[seg1] * segs.lengths[seg2]
+    seg1, seg2 = seg1[keep], seg2[keep]
+
+    # the end point of seg1 is close to the body of seg2
+    CP = segs.ends[seg1] - segs.centers[seg2]
+    along = np.einsum('ij,ij->i', CP, segs.vectors[seg2]) / segs.lengths[seg2]
+    across = np.linalg.norm(CP - (along / segs.lengths[seg2])[:, None] * segs.vectors[seg2],
+                            axis=1)
+    keep = ((across <= (1 + _SLACK) * (segs.radii[seg1] + segs.radii[seg2]) +
+             _SLACK * np.linalg.norm(CP, axis=1)) &
+            (np.abs(along) < (1 + _SLACK) * 0.55 * segs.lengths[seg2]))
+    return seg1[keep], seg2[keep]
+
+
+def _iter_back_tracking_points(section):
+    '''Ids of the points of a section whose segment back-tracks into a previous segment
+
+    The candidate pairs of segments of _back_tracking_pairs are confirmed with the exact test
+    of a pair of segments. The ids are increasing.
+    '''
+    points = section.points
+    segs = _section_segments(points)
+    if len(segs.starts) < 2:
+        return
+
+    seg1, seg2 = _back_tracking_pairs(segs)
+    order = np.lexsort((seg2, seg1))
+    last = None
+    for i, j in zip(seg1[order], seg2[order]):
+        if i != last and _is_inside_cylinder(points[segs.starts[i]:segs.starts[i] + 2],
+                                             points[segs.starts[j]:segs.starts[j] + 2]):
+            last = i
+            yield segs.starts[i] + 1
+
+
+def _iter_back_tracking(neurite):
+    '''(section id, point id) of the points of a neurite back-tracking into their section'''
     # filter out single segment sections
-    section_itr = (snode for snode in neurite.iter_sections() if snode.points.shape[0] > 2)
-    for snode in section_itr:
-        # group each section's points intro triplets
-        segment_pairs = list(filter(is_not_zero_seg, pair(snode.points)))
-
-        # filter out zero length segments
-        for i, seg1 in enumerate(segment_pairs[1:]):
-            # check if the end point of the segment lies within the previous
-            # ones in the current sectionmake
-            for seg2 in segment_pairs[0: i + 1]:
-                if is_inside_cylinder(seg1, seg2):
-                    return True
-    return False
+    for section in neurite.iter_sections():
+        if section.points.shape[0] > 2:
+            for point_id in _iter_back_tracking_points(section):
+                yield section.id, int(point_id)
+
+
+def is_back_tracking(neurite):
+    ''' Check if a neurite process backtracks to a previous node. Back-tracking takes place
+    when a daughter of a branching process goes back and either overlaps with a previous point, or
+    lies inside the cylindrical volume of the latter.
+
+    Args:
+        neurite(Neurite): neurite to operate on
+
+    Returns:
+        True Under the following scenaria:
+            1. A segment endpoint falls back and overlaps with a previous segment's point
+            2. The geometry of a segment overlaps with a previous one in the section
+    '''
+    return next(_iter_back_tracking(neurite), None) is not None
+
+
+def get_back_tracking_points(neurite):
+    '''Get the points of a neurite that back-track, as described in :meth:`is_back_tracking`
+
+    Args:
+        neurite(Neurite): neurite to operate on
+
+    Returns:
+        List of (section id, point id) of the end points of the segments that back-track into
+        a previous segment of their section
+    '''
+    return list(_iter_back_tracking(neurite))
 
 
 def get_flat_neurites(neuron, tol=0.1, method='ratio'):
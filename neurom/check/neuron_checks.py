@@ -32,7 +32,7 @@ Contains functions for checking validity of neuron neurites and somata.
 Tests assumes neurites and/or soma have been succesfully built where applicable,
 i.e. soma- and neurite-related structural tests pass.
 '''
-from itertools import chain, islice
+from itertools import chain
 
 import numpy as np
 
@@ -40,12 +40,69 @@ from neurom import NeuriteType
 from neurom._compat import zip
 from neurom.check import CheckResult
 from neurom.check.morphtree import get_flat_neurites, get_nonmonotonic_neurites
-from neurom.core import Tree, iter_neurites, iter_sections, iter_segments
+from neurom.core import Tree, iter_neurites, iter_sections
 from neurom.core.dataformat import COLS
 from neurom.fst import _neuritefunc as _nf
 from neurom.morphmath import section_length, segment_length
 
 
+def _section_points(sections):
+    '''Concatenate the points of sections
+
+    Returns:
+        tuple of the list of sections, of the array of their ids, of their concatenated points
+        and of the offsets of the sections, the points of the i-th section being
+        points[offsets[i]:offsets[i + 1]]
+    '''
+    sections = list(sections)
+    ids = np.array([s.id for s in sections], dtype=int)
+    offsets = np.zeros(len(sections) + 1, dtype=int)
+    np.cumsum([len(s.points) for s in sections], out=offsets[1:])
+    if sections:
+        points = np.concatenate([s.points for s in sections])
+    else:
+        points = np.empty((0, COLS.COL_COUNT))
+    return sections, ids, points, offsets
+
+
+def _segment_indices(offsets):
+    '''Indices of the first points of the segments of concatenated sections, and of their sections
+
+    Arguments:
+        offsets: offsets of the sections, as returned by _section_points
+    '''
+    section_index = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    # the last point of a section does not start a segment
+    is_start = np.ones(offsets[-1], dtype=bool)
+    is_start[offsets[1:][np.diff(offsets) > 0] - 1] = False
+    starts = np.flatnonzero(is_start)
+    return starts, section_index[starts]
+
+
+def _segment_lengths(points, starts):
+    '''Lengths of the segments starting at the indices starts of points'''
+    return np.linalg.norm(points[starts + 1, COLS.XYZ] - points[starts, COLS.XYZ], axis=1)
+
+
+def _recompute_borderline(values, reference, exact):
+    '''Recompute with exact(i) the values too close to their reference to be compared
+
+    The vectorized sums do not round like the per section ones, this keeps the comparisons to the
+    thresholds, and the failing ids, the same as with the per section computation
+    '''
+    for i in np.flatnonzero(np.isclose(values, reference, rtol=1e-9, atol=0)):
+        values[i] = exact(i)
+    return values
+
+
+def _neurite_second_point(neurite):
+    '''Second point of a neurite, the second point of its first section with several points'''
+    for section in neurite.root_node.ipreorder():
+        if len(section.points) > 1:
+            return section.points[1]
+    raise IndexError('Neurite has a single point')
+
+
 def _read_neurite_type(neurite):
     '''Simply read the stored neurite type'''
     return neurite.type
@@ -137,12 +194,15 @@ def has_all_nonzero_segment_lengths(neuron, threshold=0.0):
         CheckResult with result including list of (section_id, segment_id)
         of zero length segments
     '''
-    bad_ids = []
-    for sec in _nf.iter_sections(neuron):
-        p = sec.points
-        for i, s in enumerate(zip(p[:-1], p[1:])):
-            if segment_length(s) <= threshold:
-                bad_ids.append((sec.id, i))
+    _, ids, points, offsets = _section_points(_nf.iter_sections(neuron))
+    starts, section_index = _segment_indices(offsets)
+    lengths = _recompute_borderline(
+        _segment_lengths(points, starts), threshold,
+        lambda i: segment_length(points[starts[i]:starts[i] + 2]))
+    bad = lengths <= threshold
+    starts, section_index = starts[bad], section_index[bad]
+    bad_ids = list(zip(ids[section_index].tolist(),
+                       (starts - offsets[section_index]).tolist()))
 
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
@@ -158,8 +218,12 @@ def has_all_nonzero_section_lengths(neuron, threshold=0.0):
     Returns:
         CheckResult with result including list of ids of bad sections
     '''
-    bad_ids = [s.id for s in _nf.iter_sections(neuron.neurites)
-               if section_length(s.points) <= threshold]
+    sections, ids, points, offsets = _section_points(_nf.iter_sections(neuron.neurites))
+    starts, section_index = _segment_indices(offsets)
+    lengths = _recompute_borderline(
+        np.bincount(section_index, weights=_segment_lengths(points, starts), minlength=len(ids)),
+        threshold, lambda i: section_length(sections[i].points))
+    bad_ids = ids[lengths <= threshold].tolist()
 
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
@@ -175,14 +239,10 @@ def has_all_nonzero_neurite_radii(neuron, threshold=0.0):
         CheckResult with result including list of (section ID, point ID) pairs
         of zero-radius points
     '''
-    bad_ids = []
-    seen_ids = set()
-    for s in _nf.iter_sections(neuron):
-        for i, p in enumerate(s.points):
-            info = (s.id, i)
-            if p[COLS.R] <= threshold and info not in seen_ids:
-                seen_ids.add(info)
-                bad_ids.append(info)
+    _, ids, points, offsets = _section_points(_nf.iter_sections(neuron))
+    bad = np.flatnonzero(points[:, COLS.R] <= threshold)
+    section_index = np.searchsorted(offsets, bad, side='right') - 1
+    bad_ids = list(zip(ids[section_index].tolist(), (bad - offsets[section_index]).tolist()))
 
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
@@ -212,14 +272,21 @@ def has_no_jumps(neuron, max_distance=30.0, axis='z'):
     Returns:
         CheckResult with result list of ids of bad sections
     '''
-    bad_ids = []
     axis = {'x': COLS.X, 'y': COLS.Y, 'z': COLS.Z, }[axis.lower()]
-    for neurite in iter_neurites(neuron):
-        section_segment = ((sec, seg) for sec in iter_sections(neurite)
-                           for seg in iter_segments(sec))
-        for sec, (p0, p1) in islice(section_segment, 1, None):  # Skip neurite root segment
-            if max_distance < abs(p0[axis] - p1[axis]):
-                bad_ids.append((sec.id, [p0, p1]))
+    neurites = list(iter_neurites(neuron))
+    neurite_sections = [list(iter_sections(neurite)) for neurite in neurites]
+    _, ids, points, offsets = _section_points(chain.from_iterable(neurite_sections))
+    starts, section_index = _segment_indices(offsets)
+
+    # Skip neurite root segment: the first segment of each neurite
+    neurite_index = np.repeat(np.arange(len(neurites)), [len(s) for s in neurite_sections])
+    segment_neurite = neurite_index[section_index]
+    is_root = np.ones(len(starts), dtype=bool)
+    is_root[1:] = segment_neurite[1:] != segment_neurite[:-1]
+
+    bad = ~is_root & (max_distance < np.abs(points[starts, axis] - points[starts + 1, axis]))
+    bad_ids = [(section_id, [points[start], points[start + 1]])
+               for section_id, start in zip(ids[section_index[bad]].tolist(), starts[bad])]
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
 
@@ -253,12 +320,21 @@ def has_no_fat_ends(neuron, multiple_of_mean=2.0, final_point_count=5):
         by a factor of `multiple_of_mean` than the mean of the points in
         `final_point_count`
     '''
-    bad_ids = []
-    for leaf in _nf.iter_sections(neuron.neurites, iterator_type=Tree.ileaf):
-        mean_radius = np.mean(leaf.points[1:][-final_point_count:, COLS.R])
-
-        if mean_radius * multiple_of_mean <= leaf.points[-1, COLS.R]:
-            bad_ids.append((leaf.id, leaf.points[-1:]))
+    leaves, ids, points, offsets = _section_points(
+        _nf.iter_sections(neuron.neurites, iterator_type=Tree.ileaf))
+    # mean radius of the last final_point_count points of each leaf, excluding its first point
+    ends = offsets[1:]
+    window_starts = np.maximum(offsets[:-1] + 1, ends - final_point_count)
+    window_sizes = ends - window_starts
+    radii = np.append(points[:, COLS.R], 0.)
+    with np.errstate(invalid='ignore'):
+        mean_radii = np.add.reduceat(radii, np.column_stack((window_starts, ends)).ravel())[::2]
+        mean_radii = np.where(window_sizes > 0, mean_radii / np.maximum(window_sizes, 1), np.nan)
+        mean_radii = _recompute_borderline(
+            mean_radii, radii[ends - 1] / multiple_of_mean,
+            lambda i: np.mean(leaves[i].points[1:][-final_point_count:, COLS.R]))
+        bad = np.flatnonzero(mean_radii * multiple_of_mean <= radii[ends - 1])
+    bad_ids = [(ids[i].item(), points[ends[i] - 1:ends[i]]) for i in bad]
 
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
@@ -286,25 +362,33 @@ def has_no_dangling_branch(neuron):
     radius = np.linalg.norm(recentered_soma, axis=1)
     soma_max_radius = radius.max()
 
-    def is_dangling(neurite):
-        '''Is the neurite dangling ?'''
-        starting_point = neurite.points[1][COLS.XYZ]
+    neurites = list(iter_neurites(neuron))
+    if not neurites:
+        return CheckResult(True, [])
 
-        if np.linalg.norm(starting_point - soma_center) - soma_max_radius <= 12.:
-            return False
+    # the second point of a neurite is the second point of its first section with several ones
+    starting_points = np.array([_neurite_second_point(n)[COLS.XYZ] for n in neurites])
+    distances = _recompute_borderline(
+        np.linalg.norm(starting_points - soma_center, axis=1), soma_max_radius + 12.,
+        lambda i: np.linalg.norm(starting_points[i] - soma_center))
+    far = ~(distances - soma_max_radius <= 12.)
 
+    def is_dangling(neurite, starting_point):
+        '''Is the neurite, far from the soma, dangling ?'''
         if neurite.type != NeuriteType.axon:
             return True
 
-        all_points = list(chain.from_iterable(n.points[1:]
-                                              for n in iter_neurites(neurite)
-                                              if n.type != NeuriteType.axon))
-        res = [np.linalg.norm(starting_point - p[COLS.XYZ]) >= 2 * p[COLS.R] + 2
-               for p in all_points]
-        return all(res)
+        other_points = [n.points[1:] for n in iter_neurites(neurite)
+                        if n.type != NeuriteType.axon]
+        if not other_points:
+            return True
+        other_points = np.concatenate(other_points)
+        return bool(np.all(np.linalg.norm(starting_point - other_points[:, COLS.XYZ], axis=1) >=
+                           2 * other_points[:, COLS.R] + 2))
 
     bad_ids = [(n.root_node.id, [n.root_node.points[1]])
-               for n in iter_neurites(neuron) if is_dangling(n)]
+               for n, p, is_far in zip(neurites, starting_points, far)
+               if is_far and is_dangling(n, p)]
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
 
@@ -326,13 +410,21 @@ def has_no_narrow_neurite_section(neuron,
         first point
     '''
 
-    considered_sections = (sec for sec in iter_sections(neuron, neurite_filter=neurite_filter)
-                           if sec.length > considered_section_min_length)
-
-    def narrow_section(section):
-        '''Select narrow sections'''
-        return section.points[:, COLS.R].mean() < radius_threshold
-
-    bad_ids = [(section.id, section.points[1])
-               for section in considered_sections if narrow_section(section)]
+    sections, _, points, offsets = _section_points(
+        iter_sections(neuron, neurite_filter=neurite_filter))
+    starts, section_index = _segment_indices(offsets)
+    lengths = _recompute_borderline(
+        np.bincount(section_index, weights=_segment_lengths(points, starts),
+                    minlength=len(sections)),
+        considered_section_min_length, lambda i: sections[i].length)
+    if sections:
+        radii = np.append(points[:, COLS.R], 0.)
+        mean_radii = np.add.reduceat(radii, offsets[:-1]) / np.diff(offsets)
+    else:
+        mean_radii = np.empty(0)
+    mean_radii = _recompute_borderline(mean_radii, radius_threshold,
+                                       lambda i: sections[i].points[:, COLS.R].mean())
+
+    bad = (lengths > considered_section_min_length) & (mean_radii < radius_threshold)
+    bad_ids = [(sections[i].id, sections[i].points[1]) for i in np.flatnonzero(bad)]
     return CheckResult(len(bad_ids) == 0, bad_ids)
@@ -29,49 +29,193 @@
 
 '''runner for neuron morphology checks'''
 
+import json
 import logging
+import time
 from importlib import import_module
 
 from future.moves.collections import OrderedDict
 
+from neurom.apps.batch import imap_files
 from neurom.check import check_wrapper
-from neurom.exceptions import ConfigError
+from neurom.exceptions import ConfigError, FileProcessingError
 from neurom.fst import _core as fst_core
 from neurom.io import load_data, utils
 
 L = logging.getLogger(__name__)
 
+SEPARATOR = '=' * 40
 
-class CheckRunner(object):
-    '''Class managing checks, config and output'''
 
-    def __init__(self, config):
+class CheckRunner(object):
+    '''Class managing checks, config and output
+
+    Arguments:
+        config(dict): the checks to run, their options, and optionally:
+            color: whether the logged results are colored
+            fail_fast: whether to stop checking a file at its first failing check, only
+                the checks that ran are reported. The checks of each kind are run from the
+                cheapest to the most expensive according to the timings, and the neuron
+                checks are skipped, without building the neuron, if a structural check fails
+        timings(dict): the number of runs and the total duration, in seconds, of the checks,
+            keyed by 'module.check', as returned by the timings attribute after a run. It
+            is updated by each run, so that the checks are ordered by their measured costs
+    '''
+
+    def __init__(self, config, timings=None):
         self._config = CheckRunner._sanitize_config(config)
         self._check_modules = dict((k, import_module('neurom.check.%s' % k))
                                    for k in config['checks'])
+        self.timings = timings if timings is not None else {}
+        self._file_timings = {}
+
+    def run(self, path, journal=None, jobs=1, timeout=None, max_files_per_worker=None,
+            max_rss=None, cache=None, stream=None):
+        '''Test a bunch of files and return a summary JSON report
+
+        Parameters:
+            path: path of a morphology file or of a directory, or list of file paths
+            journal(neurom.apps.journal.Journal): if given, the results of the files found in
+                the journal are read from it instead of being checked again, and the results
+                of the other files are added to it
+            jobs(int): number of worker processes checking the files. The report and the
+                logs of the files are the same, and in the same order, as with a single process
+            timeout, max_files_per_worker, max_rss: limits of the worker processes, see
+                neurom.apps.batch.imap_files. If any is set, the files are checked in
+                worker processes even if jobs is 1, and the files that time out or kill
+                their worker fail
+            cache(neurom.apps.cache.ResultCache): if given, the results of the files whose
+                content was already checked with the same checks and options are read from it,
+                and the results of the other files are added to it
+            stream: if given, text file object to which the summary of each file is written, as
+                a line of JSON {file: summary}, and flushed as soon as the file is checked,
+                followed by a last line {"STATUS": status}. The summaries are not kept, and
+                the returned report only has the STATUS
+        '''
+
+        files = path if isinstance(path, (list, tuple)) else utils.get_files_by_path(path)
+        known = [self._get_known_result(f, journal, cache) for f in files]
+        checked = self._iter_checked([f for f, (result, _) in zip(files, known) if result is None],
+                                     jobs, timeout, max_files_per_worker, max_rss)
+        res, summary = self._collect(self._iter_results(files, known, checked, journal, cache),
+                                     stream)
 
-    def run(self, path):
-        '''Test a bunch of files and return a summary JSON report'''
+        L.info(SEPARATOR)
+        if cache is not None:
+            L.info('%d of %d results served from the cache',
+                   sum(source == 'cache' for _, source in known), len(files))
 
-        SEPARATOR = '=' * 40
-        summary = {}
-        res = True
+        status = 'PASS' if res else 'FAIL'
 
-        for _f in utils.get_files_by_path(path):
-            L.info(SEPARATOR)
-            status, summ = self._check_file(_f)
-            res &= status
-            if summ is not None:
-                summary.update(summ)
+        if stream is not None:
+            stream.write(json.dumps({'STATUS': status}) + '\n')
+            stream.flush()
+            return {'STATUS': status}
+        return {'files': summary, 'STATUS': status}
 
+    def _iter_checked(self, files, jobs, timeout, max_files_per_worker, max_rss):
+        '''Check the files, in worker processes if jobs or any of their limits is set
+
+        Returns:
+            iterator of the results and timings of the files, in their order, or of
+            FileProcessingError instances for the files that failed their worker
+        '''
+        if jobs == 1 and timeout is None and max_files_per_worker is None and max_rss is None:
+            return (self._timed_check_file(f) for f in files)
+        return imap_files(self._timed_check_file, files, jobs, timeout,
+                          max_files_per_worker, max_rss, buffer_logs=True)
+
+    def _get_result(self, f, known_result, checked, journal, cache):
+        '''Result of a file, the known one if any, else the next one of the checked files
+
+        A checked result is added to the journal and to the cache, if they are given. The
+        result of a file that failed its worker is a failure, and is added to neither.
+        '''
+        result, source = known_result
         L.info(SEPARATOR)
+        if result is not None:
+            L.info('File: %s, result found in %s', f, source)
+            return result
+        result = next(checked)
+        if isinstance(result, FileProcessingError):
+            return False, {f: OrderedDict([('ALL', False)])}
+        result, timings = result
+        self._add_timings(timings)
+        if journal is not None:
+            journal.add(f, result)
+        if cache is not None:
+            cache.add(f, (result[0], result[1][f]))
+        return result
+
+    def _iter_results(self, files, known, checked, journal, cache):
+        '''Results of the files, in their order, see _get_result'''
+        for f, known_result in zip(files, known):
+            yield self._get_result(f, known_result, checked, journal, cache)
 
-        status = 'PASS' if res else 'FAIL'
+    @staticmethod
+    def _collect(results, stream):
+        '''Gather the status and the summaries of the results of the files
 
-        return {'files': summary, 'STATUS': status}
+        If stream is given, the summaries are written to it instead of being gathered.
+        '''
+        res, summary = True, {}
+        for status, summ in results:
+            res &= status
+            if summ is None:
+                continue
+            if stream is not None:
+                stream.write(json.dumps(summ) + '\n')
+                stream.flush()
+            else:
+                summary.update(summ)
+        return res, summary
+
+    @staticmethod
+    def _get_known_result(f, journal, cache):
+        '''Result of a file found in the journal or in the cache, and where it was found
+
+        Returns:
+            tuple of the result and of 'journal' or 'cache', (None, None) if there is none
+        '''
+        if journal is not None and f in journal:
+            return journal[f], 'journal'
+        if cache is not None:
+            cached = cache.get(f)
+            if cached is not None:
+                return (cached[0], {f: cached[1]}), 'cache'
+        return None, None
+
+    def __getstate__(self):
+        '''Modules cannot be pickled, they are imported again when unpickling'''
+        return {'config': self._config, 'timings': self.timings}
+
+    def __setstate__(self, state):
+        self.__init__(state['config'], state['timings'])
+
+    def _add_timings(self, timings):
+        '''Add the durations of the checks of a file to the timings'''
+        for key, duration in timings.items():
+            count, total = self.timings.get(key, (0, 0.))
+            self.timings[key] = [count + 1, total + duration]
+
+    def _ordered_checks(self, check_mod_str):
+        '''Checks of a check module, from the cheapest to the most expensive in fail fast mode
+
+        The checks without timings come first, in the order of the config, to be timed.
+        '''
+        checks = self._config['checks'][check_mod_str]
+        if not self._config.get('fail_fast'):
+            return checks
+
+        def mean_duration(check):
+            '''Mean duration of a check, 0 if it has never run'''
+            count, total = self.timings.get('%s.%s' % (check_mod_str, check), (1, 0.))
+            return total / count
+        return sorted(checks, key=mean_duration)
 
     def _do_check(self, obj, check_module, check_str):
         '''Run a check function on obj'''
+        start = time.time()
         opts = self._config['options']
         if check_str in opts:
             fargs = opts[check_str]
@@ -81,6 +225,8 @@ class CheckRunner(object):
                 out = check_wrapper(getattr(check_module, check_str))(obj, fargs)
         else:
             out = check_wrapper(getattr(check_module, check_str))(obj)
+        self._file_timings['%s.%s' % (check_module.__name__.split('.')[-1], check_str)] = \
+            time.time() - start
 
         try:
             if out.info:
@@ -94,16 +240,22 @@ class CheckRunner(object):
     def _check_loop(self, obj, check_mod_str):
         '''Run all the checks in a check_module'''
         check_module = self._check_modules[check_mod_str]
-        checks = self._config['checks'][check_mod_str]
         result = True
         summary = OrderedDict()
-        for check in checks:
+        for check in self._ordered_checks(check_mod_str):
             ok = self._do_check(obj, check_module, check)
             summary[ok.title] = ok.status
             result &= ok.status
+            if not result and self._config.get('fail_fast'):
+                break
 
         return result, summary
 
+    def _timed_check_file(self, f):
+        '''Run tests on a morphology file, return the result and the durations of the checks'''
+        self._file_timings = {}
+        return self._check_file(f), self._file_timings
+
     def _check_file(self, f):
         '''Run tests on a morphology file'''
         L.info('File: %s', f)
@@ -122,10 +274,11 @@ class CheckRunner(object):
             full_result &= result
             full_summary.update(summary)
 
-            nrn = fst_core.FstNeuron(data)
-            result, summary = self._check_loop(nrn, 'neuron_checks')
-            full_result &= result
-            full_summary.update(summary)
+            if full_result or not self._config.get('fail_fast'):
+                nrn = fst_core.FstNeuron(data)
+                result, summary = self._check_loop(nrn, 'neuron_checks')
+                full_result &= result
+                full_summary.update(summary)
         except Exception as e:  # pylint: disable=W0703
             L.error('Check failed: %s', str(type(e)) + str(e.args))
             full_result = False
@@ -31,9 +31,7 @@ import numpy as np
 from neurom.check import CheckResult
 from neurom.core.dataformat import COLS
 from neurom.core.dataformat import POINT_TYPE
-from neurom.core import make_soma
-from neurom.fst._core import make_neurites
-from neurom.exceptions import SomaError
+from neurom.core import soma_type
 
 
 def has_sequential_ids(data_wrapper):
@@ -117,21 +115,20 @@ def has_all_finite_radius_neurites(data_wrapper, threshold=0.0):
 def has_valid_soma(data_wrapper):
     '''Check if a data block has a valid soma
 
+    The soma object is not built, only the type of soma the points would make is determined.
+
     Returns:
         CheckResult with result
     '''
-    try:
-        make_soma(data_wrapper.soma_points())
-        return CheckResult(True)
-    except SomaError:
-        return CheckResult(False)
+    return CheckResult(soma_type(data_wrapper.soma_points()) is not None)
 
 
 def has_valid_neurites(data_wrapper):
     '''Check if any neurites can be reconstructed from data block
 
+    The sections are not built, the data block must only have neurite root sections.
+
     Returns:
         CheckResult with result
     '''
-    n, _ = make_neurites(data_wrapper)
-    return CheckResult(len(n) > 0)
+    return CheckResult(len(data_wrapper.neurite_root_section_ids()) > 0)
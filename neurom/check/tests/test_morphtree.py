@@ -186,6 +186,28 @@ def test_is_back_tracking():
     nt.assert_false(mt.is_back_tracking(t))
 
 
+def test_get_back_tracking_points():
+    t = _generate_back_track_tree(1, (0., 0., 0.))
+    nt.assert_equal(mt.get_back_tracking_points(t), [(None, 3)])
+
+    t = _generate_back_track_tree(1, (10., -10., 10.))
+    nt.assert_equal(mt.get_back_tracking_points(t), [])
+
+    # a long section, whose candidate segments are found with a KD-tree
+    points = np.zeros((50, 7))
+    points[:, COLS.X] = np.arange(50)
+    points[:, COLS.R] = 0.1
+    points[45, COLS.XYZ] = [20.5, 0.05, 0.]
+    points[46:, COLS.Y] = 3.
+    t = Neurite(Section(points))
+    nt.assert_true(mt.is_back_tracking(t))
+    nt.assert_equal(mt.get_back_tracking_points(t), [(None, 45)])
+
+    # a very long segment does not hide the back-tracks of the short ones
+    points[-1, COLS.X] = 1000.
+    t = Neurite(Section(points))
+    nt.assert_equal(mt.get_back_tracking_points(t), [(None, 45)])
+
 def test_get_flat_neurites():
 
     n = load_neuron(os.path.join(SWC_PATH, 'Neuron.swc'))
@@ -30,6 +30,7 @@ import os
 from copy import deepcopy
 from io import StringIO
 
+import numpy as np
 from nose import tools as nt
 from nose.tools import assert_equal
 from numpy.testing import assert_array_equal
@@ -353,6 +354,27 @@ def test_has_no_jumps():
     nt.ok_(nrn_chk.has_no_jumps(nrn, 100, axis='x').status)
 
 
+def test_has_no_narrow_dendritic_section_rounding():
+    # the mean radius is 0.6, a sequential sum of the radii gives 0.6000000000000001
+    swc_content = StringIO(u'''
+    1 1 0 0 0 1.   -1
+    2 3 0 1 0 0.25  1
+    3 3 0 2 0 0.66  2
+    4 3 0 3 0 0.62  3
+    5 3 0 4 0 0.31  4
+    6 3 0 5 0 0.94  5
+    7 3 0 6 0 0.65  6
+    8 3 0 7 0 0.58  7
+    9 3 0 8 0 0.63  8
+   10 3 0 9 0 0.76  9
+''')
+    nrn = load_neuron(swc_content, reader='swc')
+    res = nrn_chk.has_no_narrow_neurite_section(nrn, dendrite_filter,
+                                                radius_threshold=np.nextafter(0.6, 1),
+                                                considered_section_min_length=0)
+    nt.ok_(not res.status)
+    assert_equal(res.info[0][0], 1)
+
 def test_has_no_narrow_dendritic_section():
     swc_content = StringIO(u"""
 # index, type, x, y, z, radius, parent
@@ -27,10 +27,13 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
+import shutil
+import tempfile
 from copy import copy
 
 from nose import tools as nt
 
+from neurom.apps.journal import Journal
 from neurom.check.runner import CheckRunner
 from neurom.exceptions import ConfigError
 
@@ -273,3 +276,111 @@ def test__sanitize_config():
     # makes no changes to already filled out config
     new_config = CheckRunner._sanitize_config(CONFIG)
     nt.eq_(CONFIG, new_config)
+
+
+def test_run_journal():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        journal_file = os.path.join(tmp_dir, 'check.journal')
+        checker = CheckRunner(CONFIG)
+        with Journal(journal_file, CONFIG) as journal:
+            nt.assert_equal(checker.run(NRN_PATH_0, journal), REF_0)
+            nt.ok_(NRN_PATH_0 in journal)
+
+        with Journal(journal_file, CONFIG) as journal:
+            # pylint: disable=protected-access
+            checker._check_file = None
+            nt.assert_equal(checker.run(NRN_PATH_0, journal), REF_0)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_run_file_list():
+    checker = CheckRunner(CONFIG)
+    summ = checker.run([NRN_PATH_0, NRN_PATH_2])
+    nt.eq_(list(summ['files']), [NRN_PATH_0, NRN_PATH_2])
+    nt.eq_(summ['files'][NRN_PATH_0], REF_0['files'][NRN_PATH_0])
+
+
+def test_run_limits():
+    import time
+    from mock import patch
+    checker = CheckRunner(CONFIG)
+    summ = checker.run([NRN_PATH_0, NRN_PATH_2], max_files_per_worker=1)
+    nt.eq_(summ, checker.run([NRN_PATH_0, NRN_PATH_2]))
+
+    def _sleep(self, f):
+        time.sleep(60)
+    with patch.object(CheckRunner, '_check_file', _sleep):
+        summ = checker.run(NRN_PATH_0, timeout=0.5)
+    nt.eq_(summ, {'files': {NRN_PATH_0: {'ALL': False}}, 'STATUS': 'FAIL'})
+
+
+def test_run_parallel():
+    checker = CheckRunner(CONFIG)
+    serial = checker.run(SWC_PATH)
+    parallel = checker.run(SWC_PATH, jobs=3)
+    nt.eq_(parallel, serial)
+    nt.eq_(list(parallel['files']), list(serial['files']))
+
+
+def test_run_cache():
+    from mock import patch
+    from neurom.apps.cache import ResultCache
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = os.path.join(tmp_dir, 'cache.db')
+        checker = CheckRunner(CONFIG)
+        with ResultCache(db, CONFIG) as cache:
+            nt.assert_equal(checker.run(NRN_PATH_0, cache=cache), REF_0)
+
+        with ResultCache(db, CONFIG) as cache:
+            with patch.object(CheckRunner, '_check_file') as mock_check:
+                nt.assert_equal(checker.run(NRN_PATH_0, cache=cache), REF_0)
+                nt.ok_(not mock_check.called)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_run_fail_fast():
+    from mock import patch
+    structural = list(REF_2['files'][NRN_PATH_2].items())[:6]
+    checker = CheckRunner(dict(CONFIG, fail_fast=True))
+    summ = checker.run(NRN_PATH_2)
+    nt.eq_(summ['STATUS'], 'FAIL')
+    nt.eq_(list(summ['files'][NRN_PATH_2].items()),
+           structural + [('Has basal dendrite', False), ('ALL', False)])
+    nt.eq_(set(checker.timings),
+           set(['structural_checks.' + c for c in CONFIG['checks']['structural_checks']] +
+               ['neuron_checks.has_basal_dendrite']))
+    nt.eq_(checker.timings['neuron_checks.has_basal_dendrite'][0], 1)
+
+    # the checks without timings run first, then from the cheapest to the most expensive
+    timings = dict(('neuron_checks.' + c, [2, 1.]) for c in CONFIG['checks']['neuron_checks'])
+    timings['neuron_checks.has_basal_dendrite'] = [1, 1.]
+    del timings['neuron_checks.has_apical_dendrite']
+    checker = CheckRunner(dict(CONFIG, fail_fast=True), timings)
+    summ = checker.run(NRN_PATH_2)
+    nt.eq_(list(summ['files'][NRN_PATH_2].items()),
+           structural + [('Has apical dendrite', True), ('Has axon', False), ('ALL', False)])
+    nt.eq_(checker.timings['neuron_checks.has_axon'][0], 3)
+
+    # the neuron is not built if a structural check fails
+    checker = CheckRunner(dict(CONFIG, fail_fast=True))
+    with patch('neurom.check.runner.fst_core.FstNeuron') as mock_neuron:
+        summ = checker.run(NRN_PATH_5)
+        nt.ok_(not mock_neuron.called)
+    nt.eq_(list(summ['files'][NRN_PATH_5].items()),
+           [('Is single tree', True), ('Has soma points', False), ('ALL', False)])
+
+
+def test_run_stream():
+    import json
+    from io import StringIO
+    checker = CheckRunner(CONFIG)
+    stream = StringIO()
+    nt.eq_(checker.run([NRN_PATH_0, NRN_PATH_2], stream=stream), {'STATUS': 'FAIL'})
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    nt.eq_(lines, [{NRN_PATH_0: REF_0['files'][NRN_PATH_0]},
+                   {NRN_PATH_2: REF_2['files'][NRN_PATH_2]},
+                   {'STATUS': 'FAIL'}])
@@ -30,14 +30,16 @@
 
 from copy import deepcopy
 from itertools import chain
+from weakref import WeakSet
 
 import numpy as np
 
 from neurom import morphmath
+from neurom import geom
 from neurom._compat import filter, map, zip
 from neurom.core._soma import Soma
 from neurom.core.dataformat import COLS
-from neurom.utils import memoize
+from neurom.utils import cached_property, clear_cache, memoize
 
 from . import NeuriteType, Tree, NeuriteIter
 
@@ -138,16 +140,29 @@ def iter_segments(obj, neurite_filter=None, neurite_order=NeuriteIter.FileOrder)
 
     Note:
         This is a convenience function provided for generic access to
-        neuron segments. It may have a performance overhead WRT custom-made
-        segment analysis functions that leverage numpy and section-wise iteration.
+        neuron segments. It iterates over the rows of the segment_starts and
+        segment_ends arrays of the neurites, which numpy-based segment analysis
+        functions can use directly.
     '''
-    sections = iter((obj,) if isinstance(obj, Section) else
-                    iter_sections(obj,
-                                  neurite_filter=neurite_filter,
-                                  neurite_order=neurite_order))
+    if isinstance(obj, Section):
+        return zip(obj.points[:-1], obj.points[1:])
 
-    return chain.from_iterable(zip(sec.points[:-1], sec.points[1:])
-                               for sec in sections)
+    return chain.from_iterable(zip(neurite.segment_starts, neurite.segment_ends)
+                               for neurite in iter_neurites(obj,
+                                                            filt=neurite_filter,
+                                                            neurite_order=neurite_order))
+
+
+def _read_only(array):
+    '''Make an array read-only and return it'''
+    array.flags.writeable = False
+    return array
+
+
+def _concatenate_neurites(neurites, name, empty):
+    '''Read-only concatenation of an array attribute of neurites, empty if there are none'''
+    arrays = [getattr(neurite, name) for neurite in neurites or ()]
+    return _read_only(np.concatenate(arrays) if arrays else empty)
 
 
 def graft_neuron(root_section):
@@ -158,38 +173,90 @@ def graft_neuron(root_section):
 
 class Section(Tree):
     '''Class representing a neurite section'''
+    # the length, area and volume are computed on first access and stored in slots,
+    # the neurites and neurons built on a root section are kept to clear their caches
+    __slots__ = ('id', '_points', 'type', '_length', '_area', '_volume', '_dependents')
 
     def __init__(self, points, section_id=None, section_type=NeuriteType.undefined):
         super(Section, self).__init__()
         self.id = section_id
-        self.points = points
+        self._points = points
         self.type = section_type
+        self._length = self._area = self._volume = None
+        self._dependents = None
+
+    @property
+    def points(self):
+        '''Return the points of this section'''
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        '''Set the points of this section, and invalidate the cached values depending on them'''
+        self._points = points
+        self.invalidate()
+
+    def invalidate(self):
+        '''Clear the cached values of this section and of the neurites and neurons it belongs to
+
+        It is called when the points are set, and must be called after they are
+        modified in place.
+        '''
+        self._length = self._area = self._volume = None
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        for dependent in getattr(root, '_dependents', None) or ():
+            clear_cache(dependent)
+
+    def add_dependent(self, obj):
+        '''Keep a weak reference to a neurite or neuron built on this root section
+
+        The values cached by obj are cleared when this section, or any of its
+        descendants, is invalidated.
+        '''
+        if self._dependents is None:
+            self._dependents = WeakSet()
+        self._dependents.add(obj)
+
+    def __getstate__(self):
+        '''The dependents are not kept, they are added again when they are rebuilt'''
+        state = super(Section, self).__getstate__()
+        state.pop('_dependents', None)
+        return state
+
+    def __setstate__(self, state):
+        self._dependents = None
+        super(Section, self).__setstate__(state)
 
     @property
-    @memoize
     def length(self):
         '''Return the path length of this section.'''
-        return morphmath.section_length(self.points)
+        if self._length is None:
+            self._length = morphmath.section_length(self.points)
+        return self._length
 
     @property
-    @memoize
     def area(self):
         '''Return the surface area of this section.
 
         The area is calculated from the segments, as defined by this
         section's points
         '''
-        return sum(morphmath.segment_area(s) for s in iter_segments(self))
+        if self._area is None:
+            self._area = morphmath.section_area(self.points)
+        return self._area
 
     @property
-    @memoize
     def volume(self):
         '''Return the volume of this section.
 
         The volume is calculated from the segments, as defined by this
         section's points
         '''
-        return sum(morphmath.segment_volume(s) for s in iter_segments(self))
+        if self._volume is None:
+            self._volume = morphmath.section_volume(self.points)
+        return self._volume
 
     def __str__(self):
         return 'Section(id=%s, type=%s, n_points=%s) <parent: %s, nchildren: %d>' % \
@@ -205,20 +272,47 @@ class Neurite(object):
         self.root_node = root_node
         self.type = root_node.type if hasattr(
             root_node, 'type') else NeuriteType.undefined
+        if isinstance(root_node, Section):
+            root_node.add_dependent(self)
 
-    @property
-    @memoize
+    @cached_property
     def points(self):
-        '''Return unordered array with all the points in this neurite'''
+        '''Return unordered, read-only, array with all the points in this neurite'''
         # add all points in a section except the first one, which is a duplicate
-        _pts = [v for s in self.root_node.ipreorder()
-                for v in s.points[1:, COLS.XYZR]]
         # except for the very first point, which is not a duplicate
-        _pts.insert(0, self.root_node.points[0][COLS.XYZR])
-        return np.array(_pts)
+        return _read_only(
+            np.concatenate([self.root_node.points[:1, COLS.XYZR]] +
+                           [s.points[1:, COLS.XYZR] for s in self.root_node.ipreorder()]))
 
-    @property
-    @memoize
+    @cached_property
+    def segment_starts(self):
+        '''Return read-only array of the start points of the segments of this neurite
+
+        The segments are in the order of iter_segments, the sections being
+        iterated in pre-order.
+        '''
+        return _read_only(np.concatenate([s.points[:-1] for s in self.root_node.ipreorder()]))
+
+    @cached_property
+    def segment_ends(self):
+        '''Return read-only array of the end points of the segments of this neurite'''
+        return _read_only(np.concatenate([s.points[1:] for s in self.root_node.ipreorder()]))
+
+    @cached_property
+    def segment_section_ids(self):
+        '''Return read-only array of the ids of the sections of the segments of this neurite'''
+        sections = list(self.root_node.ipreorder())
+        return _read_only(np.repeat([s.id for s in sections],
+                                    [max(len(s.points) - 1, 0) for s in sections]))
+
+    @cached_property
+    def segment_types(self):
+        '''Return read-only array of the types of the sections of the segments of this neurite'''
+        sections = list(self.root_node.ipreorder())
+        return _read_only(np.repeat(np.array([s.type for s in sections], dtype=object),
+                                    [max(len(s.points) - 1, 0) for s in sections]))
+
+    @cached_property
     def length(self):
         '''Return the total length of this neurite.
 
@@ -226,8 +320,7 @@ class Neurite(object):
         '''
         return sum(s.length for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property
     def area(self):
         '''Return the surface area of this neurite.
 
@@ -235,8 +328,7 @@ class Neurite(object):
         '''
         return sum(s.area for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property
     def volume(self):
         '''Return the volume of this neurite.
 
@@ -244,11 +336,84 @@ class Neurite(object):
         '''
         return sum(s.volume for s in self.iter_sections())
 
+    @cached_property
+    def convex_hull(self):
+        '''Return the convex hull of the points of this neurite
+
+        The hull is built once from the pruned point cloud and cached.
+        Transformed copies of this neurite build their own hull.
+        '''
+        return geom.convex_hull_of_points(self.points)
+
+    def _iter_section_points(self, step=1):
+        '''Iterate over the XYZ points of the sections, without duplicated section starts'''
+        for sec in self.root_node.ipreorder():
+            pts = sec.points[::step, COLS.XYZ] if sec is self.root_node else \
+                sec.points[1::step, COLS.XYZ]
+            if len(pts):
+                yield pts
+
+    @memoize
+    def point_moments(self, step=1):
+        '''Return the number of points, mean point and scatter matrix of this neurite
+
+        The moments are accumulated section by section. If `step` is larger than 1,
+        only every `step`-th point of each section is taken into account.
+        '''
+        return morphmath.merge_moments(morphmath.point_moments(pts)
+                                       for pts in self._iter_section_points(step))
+
+    def _centered_points(self):
+        '''Return a copy of the XYZ points of this neurite, centered around their mean'''
+        points = np.copy(self.points[:, COLS.XYZ])
+        points -= np.mean(points, axis=0)
+        return points
+
+    @memoize
+    def principal_directions(self, step=1):
+        '''Return the eigenvalues and eigenvectors of the covariance of this neurite's points
+
+        With the default `step`, the decomposition is computed from the points exactly as
+        morphmath.principal_direction_extent does: the eigenvectors are sensitive to
+        rounding when eigenvalues are close, so this keeps their order and sign. Otherwise
+        it is estimated from point_moments, see there for the meaning of `step`.
+        '''
+        if step == 1:
+            return morphmath.pca(self._centered_points())
+        return morphmath.pca_from_moments(self.point_moments(step))
+
+    @memoize
+    def principal_direction_extents(self, step=1):
+        '''Return the extents of this neurite along its three principal directions
+
+        With the default `step`, the result is that of morphmath.principal_direction_extent
+        on the neurite's points. Otherwise, the points are projected section by section.
+        See point_moments for the meaning of `step`.
+        '''
+        _, eigv = self.principal_directions(step)
+        if step == 1:
+            return morphmath.projection_extent(self._centered_points(), eigv)
+        mean = self.point_moments(step)[1]
+        bounds = np.array([[np.min(projs, axis=0), np.max(projs, axis=0)]
+                           for projs in (np.dot(pts - mean, eigv)
+                                         for pts in self._iter_section_points(step))])
+        return morphmath.extent_from_bounds(bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0))
+
+    @property
+    def points_extent(self):
+        '''Return the extents of this neurite's points along their principal directions
+
+        This is principal_direction_extents with the default `step`, so both share
+        the same cached decomposition.
+        '''
+        return self.principal_direction_extents()
+
     def transform(self, trans):
         '''Return a copy of this neurite with a 3D transformation applied'''
         clone = deepcopy(self)
         for n in clone.iter_sections():
             n.points[:, 0:3] = trans(n.points[:, 0:3])
+            n.invalidate()
 
         return clone
 
@@ -273,6 +438,11 @@ class Neurite(object):
         '''Deep copy of neurite object'''
         return Neurite(deepcopy(self.root_node, memo))
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self.root_node, Section):
+            self.root_node.add_dependent(self)
+
     def __nonzero__(self):
         return bool(self.root_node)
 
@@ -298,6 +468,39 @@ class Neuron(object):
         self.name = name
         self.neurites = neurites
         self.sections = sections
+        self._add_dependent()
+
+    def _add_dependent(self):
+        '''Clear the cached values when a section of a neurite is invalidated'''
+        for neurite in self.neurites or ():
+            if isinstance(neurite.root_node, Section):
+                neurite.root_node.add_dependent(self)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._add_dependent()
+
+    @cached_property
+    def segment_starts(self):
+        '''Return read-only array of the start points of the segments of the neurites'''
+        return _concatenate_neurites(self.neurites, 'segment_starts',
+                                     np.empty((0, COLS.COL_COUNT)))
+
+    @cached_property
+    def segment_ends(self):
+        '''Return read-only array of the end points of the segments of the neurites'''
+        return _concatenate_neurites(self.neurites, 'segment_ends',
+                                     np.empty((0, COLS.COL_COUNT)))
+
+    @cached_property
+    def segment_section_ids(self):
+        '''Return read-only array of the ids of the sections of the segments of the neurites'''
+        return _concatenate_neurites(self.neurites, 'segment_section_ids', np.empty(0, int))
+
+    @cached_property
+    def segment_types(self):
+        '''Return read-only array of the types of the sections of the segments of the neurites'''
+        return _concatenate_neurites(self.neurites, 'segment_types', np.empty(0, object))
 
     def __str__(self):
         return 'Neuron <soma: %s, n_neurites: %d>' % \
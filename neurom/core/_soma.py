@@ -215,12 +215,15 @@ SOMA_CONTOUR = 'contour'
 SOMA_CYLINDER = 'cylinder'
 
 
-def _get_type(points, soma_class):
-    '''get the type of the soma
+def soma_type(points, soma_class=SOMA_CONTOUR):
+    '''Get the type of soma that make_soma builds from a set of points
 
     Args:
         points: Soma points
         soma_class(str): one of 'contour' or 'cylinder' to specify the type
+
+    Returns:
+        The soma class, None if the points do not make a valid soma
     '''
     assert soma_class in (SOMA_CONTOUR, SOMA_CYLINDER)
 
@@ -267,7 +270,7 @@ def make_soma(points, soma_check=None, soma_class=SOMA_CONTOUR):
     if soma_check:
         soma_check(points)
 
-    stype = _get_type(points, soma_class)
+    stype = soma_type(points, soma_class)
 
     if stype is None:
         raise SomaError('Invalid soma points')
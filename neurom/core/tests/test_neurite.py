@@ -103,3 +103,75 @@ def test_str():
 def test_neurite_hash():
     nrt = Neurite(ROOT_NODE)
     nt.eq_(hash(nrt), hash((nrt.type, nrt.root_node)))
+
+
+def test_neurite_point_moments():
+    nrt = Neurite(ROOT_NODE)
+    n, mean, scatter = nrt.point_moments()
+    nt.eq_(n, 13)
+    np.testing.assert_allclose(mean, np.mean(nrt.points[:, :3], axis=0))
+    np.testing.assert_allclose(scatter / (n - 1), np.cov(nrt.points[:, :3].T), atol=1e-12)
+
+
+def test_neurite_principal_direction_extents():
+    nrt = Neurite(ROOT_NODE)
+    np.testing.assert_allclose(nrt.principal_direction_extents(),
+                               nm.morphmath.principal_direction_extent(nrt.points[:, :3]))
+    nt.ok_(nrt.principal_direction_extents() is nrt.principal_direction_extents())
+    nt.eq_(len(nrt.principal_direction_extents(step=2)), 3)
+
+
+def test_neurite_points_extent():
+    nrt = Neurite(ROOT_NODE)
+    np.testing.assert_array_equal(nrt.points_extent,
+                                  nm.morphmath.principal_direction_extent(nrt.points[:, :3]))
+    nt.ok_(nrt.points_extent is nrt.principal_direction_extents())
+
+
+def test_neurite_invalidate():
+    root_node = Section(POINTS0.copy())
+    child = root_node.add_child(Section(POINTS1.copy()))
+    nrt = Neurite(root_node)
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+    nt.eq_(nrt.point_moments()[0], 13)
+
+    child.points = POINTS1[:4]
+    nt.assert_almost_equal(child.length, 3)
+    nt.assert_almost_equal(nrt.length, REF_LEN - 3)
+    nt.eq_(len(nrt.points), 10)
+    nt.eq_(nrt.point_moments()[0], 10)
+
+    root_node.points[:, :3] *= 2
+    nt.assert_almost_equal(nrt.length, REF_LEN - 3)
+    root_node.invalidate()
+    nt.assert_almost_equal(root_node.length, 12)
+    nt.assert_almost_equal(nrt.length, 15)
+
+
+def test_neurite_transform_invalidates():
+    nrt = Neurite(Section(POINTS0.copy()))
+    nt.assert_almost_equal(nrt.length, 6)
+    nt.assert_almost_equal(nrt.root_node.length, 6)
+    scaled = nrt.transform(lambda p: 2 * p)
+    nt.assert_almost_equal(scaled.root_node.length, 12)
+    nt.assert_almost_equal(scaled.length, 12)
+    nt.assert_almost_equal(nrt.length, 6)
+
+
+def test_neurite_segments():
+    root_node = Section(POINTS0.copy(), section_id=0, section_type=nm.AXON)
+    child = root_node.add_child(Section(POINTS1.copy(), section_id=1,
+                                        section_type=nm.BASAL_DENDRITE))
+    nrt = Neurite(root_node)
+    np.testing.assert_array_equal(nrt.segment_starts, np.vstack((POINTS0[:-1], POINTS1[:-1])))
+    np.testing.assert_array_equal(nrt.segment_ends, np.vstack((POINTS0[1:], POINTS1[1:])))
+    np.testing.assert_array_equal(nrt.segment_section_ids, [0] * 6 + [1] * 6)
+    np.testing.assert_array_equal(nrt.segment_types, [nm.AXON] * 6 + [nm.BASAL_DENDRITE] * 6)
+    nt.ok_(nrt.segment_starts is nrt.segment_starts)
+    nt.ok_(not nrt.segment_ends.flags.writeable)
+    for seg, start, end in zip(nm.iter_segments(nrt), nrt.segment_starts, nrt.segment_ends):
+        np.testing.assert_array_equal(seg, (start, end))
+
+    child.points = POINTS1[:3]
+    nt.eq_(len(nrt.segment_starts), 8)
+    np.testing.assert_array_equal(nrt.segment_section_ids, [0] * 6 + [1] * 2)
@@ -89,3 +89,13 @@ def test_section_volume():
 
 
 
+
+
+def test_section_slots():
+
+    sec = Section(POINTS, section_id=1, section_type=nm.AXON)
+    nt.ok_(not hasattr(sec, '__dict__'))
+    nt.assert_raises(AttributeError, setattr, sec, 'foo', 1)
+    nt.ok_(sec._length is None)
+    nt.assert_almost_equal(sec.length, REF_LEN)
+    nt.eq_(sec._length, sec.length)
@@ -104,6 +104,15 @@ def test_make_Soma_ThreePointCylinder():
     nt.eq_(sm.radius, 44)
 
 
+def test_soma_type():
+    nt.ok_(_soma.soma_type(SOMA_SINGLE_PTS) is _soma.SomaSinglePoint)
+    nt.ok_(_soma.soma_type(SOMA_THREEPOINTS_PTS) is _soma.SomaSimpleContour)
+    nt.ok_(_soma.soma_type(SOMA_THREEPOINTS_PTS, _soma.SOMA_CYLINDER) is
+           _soma.SomaNeuromorphoThreePointCylinders)
+    nt.ok_(_soma.soma_type([]) is None)
+    nt.ok_(_soma.soma_type(SOMA_THREEPOINTS_PTS[:2]) is None)
+
+
 def check_SomaC(points):
     sm = _soma.make_soma(points)
     nt.ok_('SomaSimpleContour' in str(sm))
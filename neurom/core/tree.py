@@ -34,6 +34,9 @@ from neurom._compat import filter
 
 class Tree(object):
     '''Simple recursive tree class'''
+    # slots instead of a __dict__ per node, there can be millions of nodes in a population
+    __slots__ = ('parent', 'children')
+
     def __init__(self):
         self.parent = None
         self.children = list()
@@ -117,3 +120,14 @@ class Tree(object):
         return bool(self.children)
 
     __bool__ = __nonzero__
+
+    def __getstate__(self):
+        '''State of the slots of all the classes, pickle protocols < 2 cannot get it'''
+        return dict((name, getattr(self, name))
+                    for cls in type(self).__mro__
+                    for name in getattr(cls, '__slots__', ())
+                    if hasattr(self, name))
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
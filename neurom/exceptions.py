@@ -55,3 +55,7 @@ class MultipleTrees(RawDataError):
 
 class MissingParentError(RawDataError):
     '''Exception for raw data with missing parent IDs'''
+
+
+class FileProcessingError(NeuroMError):
+    '''Exception for files whose processing in a batch timed out or killed its worker'''
@@ -37,15 +37,19 @@ Examples:
 
 '''
 
+from itertools import islice as _islice
+
 import numpy as _np
 
 from . import _neuritefunc as _nrt
 from . import _neuronfunc as _nrn
 from ..core import NeuriteType as _ntype
+from ..core import Tree as _Tree
 from ..core import iter_neurites as _ineurites
 from ..core.types import tree_type_checker as _is_type
 from ..exceptions import NeuroMError
 from ._core import FstNeuron
+from ._ragged import RaggedArray, ragged_get as _ragged_get
 
 NEURITEFEATURES = {
     'total_length': _nrt.total_length,
@@ -57,6 +61,9 @@ NEURITEFEATURES = {
     'section_bif_lengths': _nrt.section_bif_lengths,
     'neurite_volumes': _nrt.total_volume_per_neurite,
     'neurite_volume_density': _nrt.neurite_volume_density,
+    'neurite_hull_volumes': _nrt.hull_volume_per_neurite,
+    'neurite_hull_areas': _nrt.hull_area_per_neurite,
+    'neurite_hull_n_vertices': _nrt.hull_n_vertices_per_neurite,
     'section_volumes': _nrt.section_volumes,
     'section_areas': _nrt.section_areas,
     'section_tortuosity': _nrt.section_tortuosity,
@@ -92,6 +99,38 @@ NEURITEFEATURES = {
     'total_area_per_neurite': _nrt.total_area_per_neurite,
 }
 
+# neurite features returning a single value per neuron, which cannot be split per neurite
+_PER_NEURON_FEATURES = frozenset((
+    _nrt.total_length,
+    _nrt.number_of_sections,
+    _nrt.number_of_neurites,
+    _nrt.number_of_bifurcations,
+    _nrt.number_of_forking_points,
+    _nrt.number_of_terminations,
+    _nrt.number_of_segments,
+))
+
+# section features returning lazy iterators: the iteration order of the sections,
+# which gives the number of values, and the type of the values
+_SECTION_ITERATORS = {
+    _nrt.section_lengths: (_Tree.ipreorder, _np.float64),
+    _nrt.section_term_lengths: (_Tree.ileaf, _np.float64),
+    _nrt.section_bif_lengths: (_Tree.ibifurcation_point, _np.float64),
+    _nrt.section_volumes: (_Tree.ipreorder, _np.float64),
+    _nrt.section_areas: (_Tree.ipreorder, _np.float64),
+    _nrt.section_tortuosity: (_Tree.ipreorder, _np.float64),
+    _nrt.section_path_lengths: (_Tree.ipreorder, _np.float64),
+    _nrt.section_end_distances: (_Tree.ipreorder, _np.float64),
+    _nrt.section_branch_orders: (_Tree.ipreorder, _np.int64),
+    _nrt.section_term_branch_orders: (_Tree.ileaf, _np.int64),
+    _nrt.section_bif_branch_orders: (_Tree.ibifurcation_point, _np.int64),
+    _nrt.section_strahler_orders: (_Tree.ipreorder, _np.int64),
+    _nrt.local_bifurcation_angles: (_Tree.ibifurcation_point, _np.float64),
+    _nrt.remote_bifurcation_angles: (_Tree.ibifurcation_point, _np.float64),
+    _nrt.bifurcation_partitions: (_Tree.ibifurcation_point, _np.float64),
+    _nrt.partition_asymmetries: (_Tree.ibifurcation_point, _np.float64),
+}
+
 NEURONFEATURES = {
     'soma_radii': _nrn.soma_radii,
     'soma_surface_areas': _nrn.soma_surface_areas,
@@ -123,23 +162,97 @@ def register_neurite_feature(name, func):
     NEURONFEATURES[name] = _fun
 
 
-def get(feature, obj, **kwargs):
+# number of values of a lazy iterator converted at a time when it fills a given array
+_FILL_CHUNK_SIZE = 4096
+
+
+def _to_array(func, values, obj, dtype, neurite_type):
+    '''Convert the values returned by the feature function `func` to an array
+
+    Arrays are returned as is, and lazy iterators of known length are consumed
+    directly into a preallocated array, without an intermediate list.
+    '''
+    if isinstance(values, _np.ndarray):
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    if func in _SECTION_ITERATORS:
+        iterator_type, default_dtype = _SECTION_ITERATORS[func]
+        count = _nrt.n_sections(obj, neurite_type=neurite_type, iterator_type=iterator_type)
+        if not count:
+            # empty results are float arrays, as for any other feature
+            return _np.array([], dtype=dtype)
+        return _np.fromiter(values, dtype=default_dtype if dtype is None else dtype, count=count)
+
+    return _np.array(list(values), dtype=dtype)
+
+
+def _check_out(out, shape, feature):
+    '''Raise a NeuroMError if the shape of the output array is not the one of the feature'''
+    if out.shape != shape:
+        raise NeuroMError('Output array of shape %s given for feature %s of shape %s' %
+                          (out.shape, feature, shape))
+
+
+def _fill(out, values):
+    '''Fill the 1D array `out` with the values of a lazy iterator, a chunk at a time'''
+    for start in range(0, len(out), _FILL_CHUNK_SIZE):
+        stop = min(start + _FILL_CHUNK_SIZE, len(out))
+        out[start:stop] = _np.fromiter(_islice(values, stop - start), dtype=out.dtype,
+                                       count=stop - start)
+
+
+def get(feature, obj, ragged=False, dtype=None, out=None, **kwargs):
     '''Obtain a feature from a set of morphology objects
 
     Parameters:
         feature(string): feature to extract
         obj: a neuron, population or neurite tree
+        ragged(bool): if True, return a RaggedArray holding the values of all
+            the neurons along with the offsets of each neuron, and of each neurite
+            for the features computed per neurite
+        dtype: optional type of the returned values, e.g. numpy.float32
+        out: optional array with the right shape in which the values are written. The
+            section features computed lazily are written to it as they are computed, the
+            values of the other features are copied to it.
         **kwargs: parameters to forward to underlying worker functions
 
     Returns:
-        features as a 1D or 2D numpy array.
+        features as a 1D or 2D numpy array (`out` if it was given), or as a RaggedArray.
 
     '''
-
-    feature = (NEURITEFEATURES[feature] if feature in NEURITEFEATURES
-               else NEURONFEATURES[feature])
-
-    return _np.array(list(feature(obj, **kwargs)))
+    if ragged:
+        if feature in NEURITEFEATURES:
+            func = NEURITEFEATURES[feature]
+            res = _ragged_get(func, obj, func not in _PER_NEURON_FEATURES, **kwargs)
+        else:
+            func = NEURONFEATURES[feature]
+            res = _ragged_get(func, obj, False, **kwargs)
+        if dtype is None and func in _SECTION_ITERATORS and len(res.values):
+            # same type as the values returned without ragged
+            dtype = _SECTION_ITERATORS[func][1]
+        if dtype is not None:
+            res.values = res.values.astype(dtype, copy=False)
+        return res
+
+    func = (NEURITEFEATURES[feature] if feature in NEURITEFEATURES
+            else NEURONFEATURES[feature])
+    neurite_type = kwargs.get('neurite_type', _ntype.all)
+
+    values = func(obj, **kwargs)
+    if out is not None and func in _SECTION_ITERATORS and not isinstance(values, _np.ndarray):
+        _check_out(out, (_nrt.n_sections(obj, neurite_type=neurite_type,
+                                         iterator_type=_SECTION_ITERATORS[func][0]),),
+                   feature)
+        _fill(out, values)
+        return out
+
+    values = _to_array(func, values, obj, dtype, neurite_type)
+    if out is None:
+        return values
+
+    _check_out(out, values.shape, feature)
+    out[...] = values
+    return out
 
 
 _INDENT = ' ' * 4
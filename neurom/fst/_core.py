@@ -32,9 +32,11 @@ from copy import deepcopy
 
 import numpy as np
 
+from neurom import geom
 from neurom.core import (Section, Neurite, Neuron, NeuriteType, SomaError,)
 from neurom.core.dataformat import POINT_TYPE, COLS, ROOT_ID
 from neurom.core._soma import make_soma, SOMA_CONTOUR, SOMA_CYLINDER
+from neurom.utils import cached_property
 
 
 class FstNeuron(Neuron):
@@ -46,18 +48,21 @@ class FstNeuron(Neuron):
         soma_check, soma_class = _SOMA_CONFIG[self._data.fmt]
         soma = make_soma(self._data.soma_points(), soma_check, soma_class)
         super(FstNeuron, self).__init__(soma, neurites, sections, name)
-        self._points = None
 
-    @property
+    @cached_property
     def points(self):
-        '''Return unordered array with all the points in this neuron'''
-        if self._points is None:
-            _points = self.soma.points.tolist()
-            for n in self.neurites:
-                _points.extend(n.points.tolist())
-            self._points = np.array(_points)
-
-        return self._points
+        '''Return unordered, read-only, array with all the points in this neuron'''
+        points = np.concatenate([self.soma.points] + [n.points for n in self.neurites])
+        points.flags.writeable = False
+        return points
+
+    @cached_property
+    def convex_hull(self):
+        '''Return the convex hull of all the points in this neuron
+
+        The hull is built once from the pruned point cloud and cached.
+        '''
+        return geom.convex_hull_of_points(self.points)
 
     def transform(self, trans):
         '''Return a copy of this neuron with a 3D transformation applied'''
@@ -39,7 +39,6 @@ from neurom.core.types import tree_type_checker as is_type
 from neurom.fst import _bifurcationfunc
 from neurom.fst import _neuronfunc
 from neurom.fst import sectionfunc
-from neurom.geom import convex_hull
 
 
 def total_length(nrn_pop, neurite_type=NeuriteType.all):
@@ -194,11 +193,23 @@ def map_segments(func, neurites, neurite_type):
     ''' Map `func` to all the segments in a collection of neurites
 
         `func` accepts a section and returns list of values corresponding to each segment.
+        The values are written section by section into an array preallocated with
+        the number of segments of the collection, which is returned.
     '''
     neurite_filter = is_type(neurite_type)
-    return [
-        s for ss in iter_sections(neurites, neurite_filter=neurite_filter) for s in func(ss)
-    ]
+    out = None
+    start = 0
+    for sec in iter_sections(neurites, neurite_filter=neurite_filter):
+        values = np.asarray(func(sec))
+        if not len(values):
+            continue
+        if out is None:
+            size = n_segments(neurites, neurite_type=neurite_type)
+            out = np.empty((size, ) + values.shape[1:], dtype=values.dtype)
+        out[start: start + len(values)] = values
+        start += len(values)
+
+    return np.empty(0) if out is None else out
 
 
 def segment_lengths(neurites, neurite_type=NeuriteType.all):
@@ -378,12 +389,30 @@ def neurite_volume_density(neurites, neurite_type=NeuriteType.all):
     '''
     def vol_density(neurite):
         '''volume density of a single neurite'''
-        return neurite.volume / convex_hull(neurite).volume
+        return neurite.volume / neurite.convex_hull.volume
 
     return list(vol_density(n)
                 for n in iter_neurites(neurites, filt=is_type(neurite_type)))
 
 
+def hull_volume_per_neurite(neurites, neurite_type=NeuriteType.all):
+    '''Get the volume of the convex hull of each neurite in a collection'''
+    return list(n.convex_hull.volume
+                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+
+
+def hull_area_per_neurite(neurites, neurite_type=NeuriteType.all):
+    '''Get the surface area of the convex hull of each neurite in a collection'''
+    return list(n.convex_hull.area
+                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+
+
+def hull_n_vertices_per_neurite(neurites, neurite_type=NeuriteType.all):
+    '''Get the number of vertices of the convex hull of each neurite in a collection'''
+    return list(len(n.convex_hull.vertices)
+                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+
+
 def section_volumes(neurites, neurite_type=NeuriteType.all):
     '''section volumes in a collection of neurites'''
     return map_sections(sectionfunc.section_volume, neurites, neurite_type=neurite_type)
@@ -404,13 +433,18 @@ def section_end_distances(neurites, neurite_type=NeuriteType.all):
     return map_sections(sectionfunc.section_end_distance, neurites, neurite_type=neurite_type)
 
 
-def principal_direction_extents(neurites, neurite_type=NeuriteType.all, direction=0):
-    '''Principal direction extent of neurites in neurons'''
+def principal_direction_extents(neurites, neurite_type=NeuriteType.all, direction=0, step=1):
+    '''Principal direction extent of neurites in neurons
+
+    If `direction` is None, the extents along the three principal directions
+    are returned for each neurite. If `step` is larger than 1, only every
+    `step`-th point of each section is used, which gives a fast approximation
+    for neurites with millions of points.
+    '''
     def _pde(neurite):
         '''Get the PDE of a single neurite'''
-        # Get the X, Y,Z coordinates of the points in each section
-        points = neurite.points[:, :3]
-        return morphmath.principal_direction_extent(points)[direction]
+        extents = neurite.principal_direction_extents(step)
+        return extents if direction is None else extents[direction]
 
     return [_pde(neurite) for neurite in iter_neurites(neurites, filt=is_type(neurite_type))]
 
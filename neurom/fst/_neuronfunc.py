@@ -34,7 +34,7 @@ from neurom.geom import bounding_box
 from neurom.core.types import NeuriteType
 from neurom.core.types import tree_type_checker as is_type
 from neurom.core.dataformat import COLS
-from neurom.core._neuron import iter_neurites, iter_segments
+from neurom.core._neuron import iter_neurites
 from neurom import morphmath
 
 
@@ -203,22 +203,20 @@ def sholl_crossings(neurites, center, radii):
         Array of same length as radii, with a count of the number of crossings
         for the respective radius
     '''
-    def _count_crossings(neurite, radius):
-        '''count_crossings of segments in neurite with radius'''
-        r2 = radius ** 2
-        count = 0
-        for start, end in iter_segments(neurite):
-            start_dist2, end_dist2 = (morphmath.point_dist2(center, start),
-                                      morphmath.point_dist2(center, end))
-
-            count += int(start_dist2 <= r2 <= end_dist2 or
-                         end_dist2 <= r2 <= start_dist2)
-
-        return count
-
-    return np.array([sum(_count_crossings(neurite, r)
-                         for neurite in iter_neurites(neurites))
-                     for r in radii])
+    def _count_crossings(neurite):
+        '''count crossings of the segments of a neurite with each radius'''
+        start_dist2 = np.sum(np.square(neurite.segment_starts[:, COLS.XYZ] - center), axis=1)
+        end_dist2 = np.sum(np.square(neurite.segment_ends[:, COLS.XYZ] - center), axis=1)
+        low, high = np.minimum(start_dist2, end_dist2), np.maximum(start_dist2, end_dist2)
+        return np.array([np.count_nonzero((low <= r2) & (r2 <= high)) for r2 in radii2], dtype=int)
+
+    center = np.asarray(center)[COLS.XYZ]
+    radii2 = np.square(np.asarray(radii, dtype=np.float64))
+    counts = np.zeros(len(radii2), dtype=int)
+    for neurite in iter_neurites(neurites):
+        counts += _count_crossings(neurite)
+
+    return counts
 
 
 def sholl_frequency(nrn, neurite_type=NeuriteType.all, step_size=10):
@@ -0,0 +1,181 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Ragged (CSR-like) storage of feature values of neuron populations'''
+
+from itertools import chain
+
+import numpy as np
+
+from neurom.core import NeuriteType, iter_neurites
+from neurom.core.types import tree_type_checker as is_type
+from neurom.fst._neuronfunc import neuron_population
+
+
+class RaggedArray(object):
+    '''Feature values of a collection of neurons, stored contiguously
+
+    The values of all the neurons are concatenated in a single array, and the
+    boundaries of each neuron (and optionally of each neurite) are given by offsets:
+    the values of the i-th neuron are ``values[offsets[i]:offsets[i + 1]]``.
+
+    Attributes:
+        values: numpy array of the concatenated feature values
+        offsets: numpy array of ``n_neurons + 1`` offsets of the neurons in values
+        neurite_offsets: numpy array of ``n_neurites + 1`` offsets of the neurites
+            in values, or None if the feature is not defined per neurite
+    '''
+
+    def __init__(self, values, offsets, neurite_offsets=None):
+        self.values = values
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        self.neurite_offsets = (None if neurite_offsets is None else
+                                np.asarray(neurite_offsets, dtype=np.intp))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        '''Values of the i-th neuron'''
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def counts(self):
+        '''Number of values per neuron'''
+        return np.diff(self.offsets)
+
+    def split(self, per_neurite=False):
+        '''Return a list of views of the values of each neuron, or each neurite'''
+        offsets = self._get_offsets(per_neurite)
+        return np.split(self.values, offsets[1:-1])
+
+    def reduce(self, ufunc, per_neurite=False, empty=np.nan):
+        '''Reduce the values of each neuron, or each neurite, with a numpy ufunc
+
+        Parameters:
+            ufunc: numpy ufunc, for instance numpy.add or numpy.maximum
+            per_neurite(bool): reduce per neurite instead of per neuron
+            empty: value of the reduction for the neurons without values
+        '''
+        offsets = self._get_offsets(per_neurite)
+        counts = np.diff(offsets)
+        res = np.full((len(counts), ) + self.values.shape[1:], empty,
+                      dtype=np.result_type(self.values, np.asarray(empty)))
+        non_empty = counts > 0
+        if np.any(non_empty):
+            # empty groups hold no values: reducing from the starts of the
+            # non-empty groups only gives the right boundaries
+            res[non_empty] = ufunc.reduceat(self.values, offsets[:-1][non_empty], axis=0)
+        return res
+
+    def sum(self, per_neurite=False):
+        '''Sum of the values of each neuron, or each neurite'''
+        return self.reduce(np.add, per_neurite, empty=0)
+
+    def mean(self, per_neurite=False):
+        '''Mean of the values of each neuron, or each neurite'''
+        counts = np.diff(self._get_offsets(per_neurite))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum(per_neurite) / counts.reshape((-1, ) + (1, ) * (self.values.ndim - 1))
+
+    def min(self, per_neurite=False):
+        '''Minimum of the values of each neuron, or each neurite'''
+        return self.reduce(np.minimum, per_neurite)
+
+    def max(self, per_neurite=False):
+        '''Maximum of the values of each neuron, or each neurite'''
+        return self.reduce(np.maximum, per_neurite)
+
+    def _get_offsets(self, per_neurite):
+        '''Select the neuron or neurite offsets'''
+        if not per_neurite:
+            return self.offsets
+        if self.neurite_offsets is None:
+            raise ValueError('Feature values are not available per neurite')
+        return self.neurite_offsets
+
+    def __str__(self):
+        return 'RaggedArray <n_neurons: %d, n_values: %d>' % (len(self), len(self.values))
+
+    __repr__ = __str__
+
+
+_EMPTY = object()
+
+
+def _as_array(values):
+    '''Convert the output of a feature function to an array
+
+    Iterators of scalars are consumed directly into an array, without
+    an intermediate list.
+    '''
+    if isinstance(values, np.ndarray):
+        return values
+    if isinstance(values, (list, tuple)):
+        return np.asarray(values)
+
+    values = iter(values)
+    first = next(values, _EMPTY)
+    if first is _EMPTY:
+        return np.empty(0)
+    if np.ndim(first) == 0:
+        return np.fromiter(chain((first, ), values), dtype=np.result_type(first))
+    return np.array([first] + list(values))
+
+
+def _concatenate(chunks):
+    '''Concatenate feature arrays, an empty float array if there are none'''
+    chunks = [c for c in chunks if len(c)]
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+def ragged_get(feature, obj, per_neurite, **kwargs):
+    '''Compute a feature on each neuron of obj and store the results in a RaggedArray
+
+    Parameters:
+        feature: feature function
+        obj: a neuron, population or neurite tree
+        per_neurite(bool): whether the feature can be computed neurite by neurite,
+            in which case neurite offsets are also recorded
+        kwargs: parameters forwarded to the feature function
+    '''
+    chunks, offsets, neurite_offsets = [], [0], [0]
+    neurite_filter = is_type(kwargs.get('neurite_type', NeuriteType.all))
+    for nrn in neuron_population(obj):
+        if per_neurite:
+            for neurite in iter_neurites(nrn, filt=neurite_filter):
+                chunks.append(_as_array(feature(neurite, **kwargs)))
+                neurite_offsets.append(neurite_offsets[-1] + len(chunks[-1]))
+            offsets.append(neurite_offsets[-1])
+        else:
+            chunks.append(_as_array(feature(nrn, **kwargs)))
+            offsets.append(offsets[-1] + len(chunks[-1]))
+
+    return RaggedArray(_concatenate(chunks), offsets, neurite_offsets if per_neurite else None)
@@ -28,12 +28,14 @@
 
 '''Test neurom.fst._core module'''
 
+import pickle
 from copy import deepcopy
 import numpy as np
 from nose import tools as nt
 import os
 from neurom.fst import _core
 from neurom import io as _io
+from neurom.core import Neuron, iter_segments
 
 _path = os.path.dirname(os.path.abspath(__file__))
 DATA_ROOT = os.path.join(_path, '../../../test_data')
@@ -89,3 +91,62 @@ def test_neurite_deepcopy():
     nt.assert_true(nrt is not nrt2)
 
     _check_cloned_neurites(nrt, nrt2)
+
+
+def test_neuron_pickle():
+
+    d = _io.load_neuron(FILENAMES[0])
+    lengths = [s.length for s in d.sections]
+    points = [n.points for n in d.neurites]
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        p = pickle.loads(pickle.dumps(d, protocol))
+        nt.eq_([s.length for s in p.sections], lengths)
+        for a, b in zip(d.neurites, p.neurites):
+            _check_cloned_neurites(a, b)
+            nt.assert_true(b.root_node.children[0].parent is b.root_node)
+        for a, b in zip(points, p.neurites):
+            nt.assert_true(np.all(a == b.points))
+
+
+def test_neuron_points():
+
+    d = _io.load_neuron(FILENAMES[0])
+    ref = np.vstack([d.soma.points] + [n.points for n in d.neurites])
+    np.testing.assert_array_equal(d.points, ref)
+    nt.assert_true(d.points is d.points)
+    nt.assert_false(d.points.flags.writeable)
+    nt.assert_false(d.neurites[0].points.flags.writeable)
+
+    sec = d.neurites[0].root_node.children[0]
+    sec.points = sec.points[:2]
+    np.testing.assert_array_equal(d.points,
+                                  np.vstack([d.soma.points] + [n.points for n in d.neurites]))
+    nt.assert_true(len(d.points) < len(ref))
+
+    p = pickle.loads(pickle.dumps(d))
+    n_points = len(p.points)
+    sec = p.neurites[0].root_node
+    sec.points = sec.points[:2]
+    nt.assert_true(len(p.points) < n_points)
+
+
+
+def test_neuron_segments():
+
+    d = _io.load_neuron(FILENAMES[0])
+    starts, ends = zip(*iter_segments(d))
+    np.testing.assert_array_equal(d.segment_starts, starts)
+    np.testing.assert_array_equal(d.segment_ends, ends)
+    sections = [s for n in d.neurites for s in n.iter_sections()]
+    np.testing.assert_array_equal(d.segment_section_ids,
+                                  [s.id for s in sections for _ in s.points[1:]])
+    nt.eq_(list(d.segment_types), [s.type for s in sections for _ in s.points[1:]])
+
+    sections[-1].points = sections[-1].points[:2]
+    nt.eq_(len(d.segment_starts), len(list(iter_segments(d))))
+    nt.assert_true(len(d.segment_starts) < len(starts))
+
+    empty = Neuron(neurites=[])
+    nt.eq_(empty.segment_starts.shape, (0, 7))
+    nt.eq_(len(empty.segment_types), 0)
@@ -31,6 +31,7 @@
 import os
 import math
 import numpy as np
+from mock import patch
 from numpy.testing import assert_allclose
 from nose import tools as nt
 import neurom as nm
@@ -600,6 +601,49 @@ def test_segment_lengths():
     assert_allclose(seglen, ref_seglen)
 
 
+def test_get_dtype():
+    seglen = fst_get('segment_lengths', POP, dtype=np.float32)
+    nt.eq_(seglen.dtype, np.float32)
+    assert_allclose(seglen, fst_get('segment_lengths', POP), rtol=1e-6)
+
+    sec_len = fst_get('section_lengths', POP, dtype=np.float32)
+    nt.eq_(sec_len.dtype, np.float32)
+    nt.eq_(len(sec_len), len(fst_get('section_lengths', POP)))
+
+    nt.eq_(fst_get('section_branch_orders', NRN).dtype, np.int64)
+    nt.eq_(len(fst_get('section_bif_lengths', POP, neurite_type=NeuriteType.axon)),
+           nf.n_bifurcation_points(POP, neurite_type=NeuriteType.axon))
+
+
+def test_get_out():
+    ref = fst_get('segment_midpoints', POP)
+    out = np.zeros(ref.shape, dtype=np.float32)
+    res = fst_get('segment_midpoints', POP, out=out)
+    nt.ok_(res is out)
+    assert_allclose(out, ref, rtol=1e-6)
+
+    out = np.zeros(len(fst_get('section_lengths', NRN)))
+    fst_get('section_lengths', NRN, out=out)
+    assert_allclose(out, fst_get('section_lengths', NRN))
+
+    # lazy section features are written to out a chunk at a time
+    ref = fst_get('section_branch_orders', POP)
+    out = np.zeros(len(ref), dtype=np.float32)
+    with patch('neurom.fst._FILL_CHUNK_SIZE', 7):
+        fst_get('section_branch_orders', POP, out=out)
+    assert_allclose(out, ref)
+
+
+@nt.raises(NeuroMError)
+def test_get_out_wrong_shape():
+    fst_get('segment_lengths', NRN, out=np.empty(3))
+
+
+@nt.raises(NeuroMError)
+def test_get_out_wrong_shape_lazy():
+    fst_get('section_lengths', NRN, out=np.empty(3))
+
+
 def test_local_bifurcation_angles():
     ref_local_bifangles = list(nf.local_bifurcation_angles(NEURON))
 
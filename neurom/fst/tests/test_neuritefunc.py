@@ -63,6 +63,28 @@ def test_principal_direction_extents():
     p = _nf.principal_direction_extents(nrn)
     _close(np.array(p), np.array(p_ref))
 
+    all_dirs = np.array(_nf.principal_direction_extents(nrn, direction=None))
+    nt.eq_(all_dirs.shape, (7, 3))
+    _close(all_dirs[:, 0], np.array(p_ref))
+    _close(all_dirs[:, 1], np.array(_nf.principal_direction_extents(nrn, direction=1)))
+
+
+def test_principal_direction_extents_match_morphmath():
+    nt.assert_almost_equal(
+        _nf.principal_direction_extents(nm.load_neuron(os.path.join(SWC_PATH, 'Single_axon.swc')))[0],
+        99.96881327, places=6)
+    assert_allclose(
+        _nf.principal_direction_extents(nm.load_neuron(os.path.join(SWC_PATH, 'empty_segments.swc')),
+                                        direction=None)[0],
+        [sqrt(2), sqrt(2), 0.], atol=1e-12)
+
+    for filename in ('Neuron.swc', 'Single_axon.swc', 'Single_basal.swc', 'empty_segments.swc',
+                     'simple.swc', 'strahler.swc', 'test_morph.swc'):
+        nrn = nm.load_neuron(os.path.join(SWC_PATH, filename))
+        ref = [nm.morphmath.principal_direction_extent(n.points[:, :3]) for n in nrn.neurites]
+        for extents, ref_extents in zip(_nf.principal_direction_extents(nrn, direction=None), ref):
+            assert_allclose(extents, ref_extents, rtol=1e-12)
+
 
 def test_n_bifurcation_points():
     nt.assert_equal(_nf.n_bifurcation_points(SIMPLE.neurites[0]), 1)
@@ -129,6 +151,14 @@ def test_neurite_volume_density():
     assert_allclose(vol_density, ref_density)
 
 
+def test_hull_per_neurite():
+    hulls = [convex_hull(n) for n in nm.iter_neurites(NRN)]
+    assert_allclose(_nf.hull_volume_per_neurite(NRN), [h.volume for h in hulls])
+    assert_allclose(_nf.hull_area_per_neurite(NRN), [h.area for h in hulls])
+    nt.eq_(_nf.hull_n_vertices_per_neurite(NRN), [len(h.vertices) for h in hulls])
+    nt.eq_(len(_nf.hull_volume_per_neurite(NRN, neurite_type=nm.AXON)), 1)
+
+
 def test_terminal_path_length_per_neurite():
     terminal_distances = _nf.terminal_path_lengths_per_neurite(SIMPLE)
     assert_allclose(terminal_distances,
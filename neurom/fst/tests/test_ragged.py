@@ -0,0 +1,102 @@
+# Copyright (c) 2015, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Test neurom.fst._ragged'''
+
+import os
+
+import numpy as np
+from numpy.testing import assert_allclose
+from nose import tools as nt
+
+import neurom as nm
+from neurom import fst
+from neurom.fst import RaggedArray
+
+_PWD = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(_PWD, '../../../test_data')
+NRN_FILES = [os.path.join(DATA_PATH, 'h5/v1', f)
+             for f in ('Neuron.h5', 'Neuron_2_branch.h5', 'bio_neuron-001.h5')]
+POP = nm.load_neurons(NRN_FILES)
+
+
+def test_reduce_empty_groups():
+    ragged = RaggedArray(np.array([1., 2., 3., 4.]), [0, 0, 3, 3, 4])
+    nt.eq_(len(ragged), 4)
+    assert_allclose(ragged.counts(), [0, 3, 0, 1])
+    assert_allclose(ragged.sum(), [0., 6., 0., 4.])
+    assert_allclose(ragged.max(), [np.nan, 3., np.nan, 4.])
+    assert_allclose(ragged.mean(), [np.nan, 2., np.nan, 4.])
+    assert_allclose(ragged[1], [1., 2., 3.])
+    nt.eq_([len(v) for v in ragged.split()], [0, 3, 0, 1])
+
+
+@nt.raises(ValueError)
+def test_no_neurite_offsets():
+    RaggedArray(np.array([1.]), [0, 1]).sum(per_neurite=True)
+
+
+def test_get_ragged_segment_lengths():
+    ragged = fst.get('segment_lengths', POP, ragged=True)
+    nt.eq_(len(ragged), len(POP))
+    assert_allclose(ragged.values, fst.get('segment_lengths', POP))
+    for values, nrn in zip(ragged, POP):
+        assert_allclose(values, fst.get('segment_lengths', nrn))
+
+    n_neurites = sum(len(nrn.neurites) for nrn in POP)
+    nt.eq_(len(ragged.neurite_offsets), n_neurites + 1)
+    assert_allclose(ragged.sum(per_neurite=True),
+                    [sum(fst.get('segment_lengths', n)) for n in nm.iter_neurites(POP)])
+
+
+def test_get_ragged_neurite_type():
+    ragged = fst.get('section_lengths', POP, ragged=True, neurite_type=nm.AXON)
+    assert_allclose(ragged.values, fst.get('section_lengths', POP, neurite_type=nm.AXON))
+    nt.eq_(len(ragged.neurite_offsets), 4)
+
+
+def test_get_ragged_2d():
+    ragged = fst.get('segment_midpoints', POP, ragged=True)
+    assert_allclose(ragged.values, fst.get('segment_midpoints', POP))
+    nt.eq_(ragged.max().shape, (3, 3))
+
+
+def test_get_ragged_per_neuron_features():
+    ragged = fst.get('number_of_sections', POP, ragged=True)
+    nt.ok_(ragged.neurite_offsets is None)
+    assert_allclose(ragged.values, fst.get('number_of_sections', POP))
+
+    ragged = fst.get('soma_radii', POP, ragged=True)
+    assert_allclose(ragged.values, fst.get('soma_radii', POP))
+    assert_allclose(ragged.counts(), [1, 1, 1])
+
+
+def test_get_ragged_dtype():
+    nrn = nm.load_neuron(os.path.join(DATA_PATH, 'swc', 'Neuron_disconnected_components.swc'))
+    for feature in ('section_areas', 'section_tortuosity', 'section_branch_orders'):
+        nt.eq_(fst.get(feature, nrn, ragged=True).values.dtype, fst.get(feature, nrn).dtype)
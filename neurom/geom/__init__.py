@@ -28,10 +28,37 @@
 
 ''' Geometrical Operations for NeuroM '''
 
+import sys
+from itertools import product
+
 import numpy as np
-from scipy.spatial import ConvexHull
 from .transform import translate, rotate
 
+# axis-aligned and diagonal directions used to find extreme points
+_HULL_DIRECTIONS = np.array([d for d in product((-1, 0, 1), repeat=3) if any(d)],
+                            dtype=np.float64)
+
+
+def _qhull():
+    '''ConvexHull and QhullError, scipy.spatial being imported on first use as it is slow'''
+    from scipy import spatial
+    try:
+        qhull_error = spatial.QhullError
+    except AttributeError:  # pragma: no cover
+        from scipy.spatial import qhull
+        qhull_error = qhull.QhullError
+    return spatial.ConvexHull, qhull_error
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        '''Give access to the ConvexHull and QhullError that used to be imported eagerly'''
+        if name in ('ConvexHull', 'QhullError'):
+            return _qhull()[name == 'QhullError']
+        raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+else:  # pragma: no cover
+    ConvexHull, QhullError = _qhull()
+
 
 def bounding_box(obj):
     '''Get the (x, y, z) bounding box of an object containing points
@@ -50,4 +77,52 @@ def convex_hull(obj):
         scipy.spatial.ConvexHull object built from obj.points
 
     '''
-    return ConvexHull(obj.points[:, :3])
+    hull_cls, _ = _qhull()
+    return hull_cls(obj.points[:, :3])
+
+
+def prune_hull_points(points):
+    '''Remove points that cannot be vertices of the convex hull of `points`
+
+    Duplicate points are dropped, then the points strictly inside the hull of
+    the extreme points along the axes and diagonals (Akl-Toussaint heuristic)
+    are discarded. The convex hull of the returned points is the same as the
+    convex hull of the input, but is much cheaper to build for dense point clouds.
+
+    Parameters:
+        points: 2D numpy array of [x, y, z] points
+
+    Returns:
+        2D numpy array of the remaining points
+    '''
+    points = np.unique(np.asarray(points, dtype=np.float64), axis=0)
+    if len(points) <= len(_HULL_DIRECTIONS):
+        return points
+
+    hull_cls, qhull_error = _qhull()
+    extremes = np.unique(np.argmax(points.dot(_HULL_DIRECTIONS.T), axis=0))
+    try:
+        inner = hull_cls(points[extremes])
+    except qhull_error:
+        # degenerate extreme points (e.g. planar cloud): let qhull handle all the points
+        return points
+
+    tol = 1e-10 * max(np.abs(points).max(), 1.)
+    inside = np.ones(len(points), dtype=bool)
+    for normal, offset in zip(inner.equations[:, :3], inner.equations[:, 3]):
+        # only points outside or on some facet of the inner hull can be hull vertices
+        inside &= points.dot(normal) + offset < -tol
+    keep = ~inside
+    keep[extremes] = True
+    return points[keep]
+
+
+def convex_hull_of_points(points):
+    '''Get the convex hull of a set of points, pruning interior points first
+
+    Returns:
+        scipy.spatial.ConvexHull object built from the points returned by
+        :func:`prune_hull_points`
+    '''
+    hull_cls, _ = _qhull()
+    return hull_cls(prune_hull_points(points[:, :3]))
@@ -89,3 +89,45 @@ def test_convex_hull_volume():
     # to re-test scipy, so simply regression test the volume
     hull = geom.convex_hull(NRN)
     nt.assert_almost_equal(hull.volume, 208641.65, places=3)
+
+
+def test_prune_hull_points():
+    np.random.seed(0)
+    pts = np.random.random((1000, 3))
+    pts = np.vstack((pts, pts[:10]))
+
+    pruned = geom.prune_hull_points(pts)
+    nt.ok_(len(pruned) < len(pts))
+    nt.eq_(len(pruned), len(np.unique(pruned, axis=0)))
+
+    hull = geom.convex_hull_of_points(pts)
+    ref = geom.ConvexHull(pts)
+    nt.assert_almost_equal(hull.volume, ref.volume)
+    nt.assert_almost_equal(hull.area, ref.area)
+    nt.eq_(len(hull.vertices), len(ref.vertices))
+
+
+def test_prune_hull_points_planar():
+    pts = np.zeros((100, 3))
+    pts[:, :2] = np.random.random((100, 2))
+    nt.eq_(len(geom.prune_hull_points(pts)), len(np.unique(pts, axis=0)))
+
+
+def test_convex_hull_cached():
+    nrt = NRN.neurites[0]
+    nt.ok_(nrt.convex_hull is nrt.convex_hull)
+    nt.assert_almost_equal(nrt.convex_hull.volume, geom.convex_hull(nrt).volume)
+
+    nt.ok_(NRN.convex_hull is NRN.convex_hull)
+    nt.assert_almost_equal(NRN.convex_hull.volume, 208641.65, places=3)
+
+
+def test_convex_hull_transform():
+    hull = NRN.convex_hull
+    scaled = NRN.transform(lambda p: 2 * p)
+    nt.ok_(scaled.convex_hull is not hull)
+    nt.assert_almost_equal(scaled.convex_hull.volume, 8 * hull.volume, places=2)
+
+    nrt = NRN.neurites[0]
+    nt.assert_almost_equal(nrt.transform(lambda p: 2 * p).convex_hull.volume,
+                           8 * nrt.convex_hull.volume, places=2)
@@ -33,6 +33,7 @@ from collections import defaultdict, namedtuple
 
 import numpy as np
 from neurom.core.dataformat import COLS, POINT_TYPE, ROOT_ID
+from neurom.utils import memoize
 
 L = logging.getLogger(__name__)
 
@@ -73,12 +74,17 @@ class DataWrapper(object):
         # list of DataBlockSection
         self.sections = sections if sections is not None else _extract_sections(data_block)
 
+    @memoize
     def neurite_root_section_ids(self):
-        '''Get the section IDs of the intitial neurite sections'''
+        '''Get the section IDs of the intitial neurite sections
+
+        They are computed once, and shared by the checks and the neuron built from the data,
+        as a tuple so that they cannot be modified.
+        '''
         sec = self.sections
-        return [i for i, ss in enumerate(sec)
-                if ss.pid > -1 and (sec[ss.pid].ntype == POINT_TYPE.SOMA and
-                                    ss.ntype != POINT_TYPE.SOMA)]
+        return tuple(i for i, ss in enumerate(sec)
+                     if ss.pid > -1 and (sec[ss.pid].ntype == POINT_TYPE.SOMA and
+                                         ss.ntype != POINT_TYPE.SOMA))
 
     def soma_points(self):
         '''Get the soma points'''
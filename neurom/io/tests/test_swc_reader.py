@@ -68,14 +68,16 @@ def test_read_swc_basic_with_offset_42():
 
 def test_read_single_neurite():
     rdw = swc.read(os.path.join(SWC_PATH, 'point_soma_single_neurite.swc'))
-    nt.eq_(rdw.neurite_root_section_ids(), [1])
+    nt.eq_(rdw.neurite_root_section_ids(), (1,))
     nt.eq_(len(rdw.soma_points()), 1)
     nt.eq_(len(rdw.sections), 2)
+    # computed once for the checks and the neuron
+    nt.ok_(rdw.neurite_root_section_ids() is rdw.neurite_root_section_ids())
 
 
 def test_read_split_soma():
     rdw = swc.read(os.path.join(SWC_PATH, 'split_soma_single_neurites.swc'))
-    nt.eq_(rdw.neurite_root_section_ids(), [1, 3])
+    nt.eq_(rdw.neurite_root_section_ids(), (1, 3))
     nt.eq_(len(rdw.soma_points()), 3)
     nt.eq_(len(rdw.sections), 4)
 
@@ -91,6 +93,6 @@ def test_read_split_soma():
 
 def test_simple_reversed():
     rdw = swc.read(os.path.join(SWC_PATH, 'simple_reversed.swc'))
-    nt.eq_(rdw.neurite_root_section_ids(), [5, 6])
+    nt.eq_(rdw.neurite_root_section_ids(), (5, 6))
     nt.eq_(len(rdw.soma_points()), 1)
     nt.eq_(len(rdw.sections), 7)
@@ -98,6 +98,15 @@ def test_load_neurons():
     nt.assert_raises(SomaError, utils.load_neurons, NO_SOMA_FILE)
 
 
+def test_iter_neurons():
+    nrns = utils.iter_neurons(FILES, neuron_loader=_mock_load_neuron)
+    nt.ok_(not isinstance(nrns, (list, tuple)))
+    nt.eq_([nrn.name for nrn in nrns], [_get_name(f) for f in FILES])
+
+    nrns = list(utils.iter_neurons([NO_SOMA_FILE, FILES[0]], ignored_exceptions=(SomaError, )))
+    nt.eq_(len(nrns), 1)
+
+
 def test_get_morph_files():
     ref = set(['Neuron_h5v2.h5', 'Neuron_2_branch_h5v2.h5', 'Neuron_slice.h5',
                'Neuron.swc', 'Neuron_h5v1.h5', 'Neuron_2_branch_h5v1.h5'])
@@ -93,10 +93,10 @@ def get_morph_files(directory):
     '''Get a list of all morphology files in a directory
 
     Returns:
-        list with all files with extensions '.swc' , 'h5' or '.asc' (case insensitive)
+        sorted list with all files with extensions '.swc' , 'h5' or '.asc' (case insensitive)
     '''
     lsdir = (os.path.join(directory, m) for m in os.listdir(directory))
-    return list(filter(_is_morphology_file, lsdir))
+    return sorted(filter(_is_morphology_file, lsdir))
 
 
 def get_files_by_path(path):
@@ -149,19 +149,32 @@ def load_neurons(neurons,
         files = get_files_by_path(neurons)
         name = name if name is not None else os.path.basename(neurons)
 
+    pop = list(iter_neurons(files, neuron_loader, ignored_exceptions))
+    return population_class(pop, name=name)
+
+
+def iter_neurons(files, neuron_loader=load_neuron, ignored_exceptions=()):
+    '''Lazily load neurons from a list of file names, one at a time
+
+    Parameters:
+        files: iterable of neuron file paths
+        neuron_loader: function taking a filename and returning a neuron
+        ignored_exceptions: NeuroMError subclasses for which files are skipped
+
+    Returns:
+        generator of neurons; only one neuron needs to be kept in memory at a time
+    '''
     ignored_exceptions = tuple(ignored_exceptions)
-    pop = []
     for f in files:
         try:
-            pop.append(neuron_loader(f))
+            nrn = neuron_loader(f)
         except NeuroMError as e:
             if isinstance(e, ignored_exceptions):
                 L.info('Ignoring exception "%s" for file %s',
                        e, os.path.basename(f))
                 continue
             raise
-
-    return population_class(pop, name=name)
+        yield nrn
 
 
 def _get_file(handle):
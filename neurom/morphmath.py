@@ -336,6 +336,44 @@ def segment_volume(seg):
     return math.pi * h * ((r0 * r0) + (r0 * r1) + (r1 * r1)) / 3.0
 
 
+def segment_areas(starts, ends):
+    '''Compute the surface areas of segments given by arrays of start and end points
+
+    Vectorized version of segment_area.
+    '''
+    r0 = starts[:, COLS.R]
+    r1 = ends[:, COLS.R]
+    h2 = np.sum(np.square(ends[:, COLS.XYZ] - starts[:, COLS.XYZ]), axis=1)
+    return math.pi * (r0 + r1) * np.sqrt((r0 - r1) ** 2 + h2)
+
+
+def segment_volumes(starts, ends):
+    '''Compute the volumes of segments given by arrays of start and end points
+
+    Vectorized version of segment_volume.
+    '''
+    r0 = starts[:, COLS.R]
+    r1 = ends[:, COLS.R]
+    h = np.linalg.norm(ends[:, COLS.XYZ] - starts[:, COLS.XYZ], axis=1)
+    return math.pi * h * ((r0 * r0) + (r0 * r1) + (r1 * r1)) / 3.0
+
+
+def section_area(points):
+    '''Compute the surface area of a section, the sum of the areas of its segments'''
+    if len(points) < 2:
+        return 0.
+    points = np.asarray(points)
+    return np.sum(segment_areas(points[:-1], points[1:]))
+
+
+def section_volume(points):
+    '''Compute the volume of a section, the sum of the volumes of its segments'''
+    if len(points) < 2:
+        return 0.
+    points = np.asarray(points)
+    return np.sum(segment_volumes(points[:-1], points[1:]))
+
+
 def taper_rate(p0, p1):
     '''Compute the taper rate between points p0 and p1
 
@@ -374,6 +412,83 @@ def pca(points):
     return np.linalg.eig(np.cov(points.transpose()))
 
 
+def point_moments(points):
+    '''
+    Compute the first and second order moments of a point cloud
+
+    Input
+        A numpy array of points of the form ((x1,y1,z1), (x2, y2, z2)...)
+
+    Output
+        Tuple of number of points, mean point and scatter matrix (the sum of
+        the outer products of the centered points)
+    '''
+    points = np.asarray(points, dtype=np.float64)
+    mean = np.mean(points, axis=0)
+    centered = points - mean
+    return len(points), mean, centered.T.dot(centered)
+
+
+def merge_moments(moments):
+    '''
+    Merge the moments of several point clouds into the moments of their union
+
+    Input
+        An iterable of (n, mean, scatter) tuples, as returned by point_moments
+
+    Output
+        Tuple of number of points, mean point and scatter matrix of the union
+    '''
+    counts, means, scatters = zip(*moments)
+    counts = np.asarray(counts, dtype=np.float64)
+    means = np.asarray(means)
+    total = counts.sum()
+    mean = counts.dot(means) / total
+    delta = means - mean
+    scatter = np.sum(scatters, axis=0) + np.einsum('i,ij,ik->jk', counts, delta, delta)
+    return int(total), mean, scatter
+
+
+def pca_from_moments(moments):
+    '''
+    Estimate the principal components of the covariance from point cloud moments
+
+    Input
+        Tuple of (n, mean, scatter) as returned by point_moments or merge_moments
+
+    Output
+        Eigenvalues and respective eigenvectors, as returned by pca
+    '''
+    n, _, scatter = moments
+    return np.linalg.eig(scatter / (n - 1))
+
+
+def projection_extent(points, eigv):
+    '''
+    Calculate the extents of centered points projected on principal directions
+
+    Input
+        points: 2D numpy array of points centered around 0.0
+        eigv: principal directions, as the columns of a matrix
+
+    Output
+        extents along each of the directions
+    '''
+    projs = np.dot(points, eigv)
+    return extent_from_bounds(projs.min(axis=0), projs.max(axis=0))
+
+
+def extent_from_bounds(mins, maxs):
+    '''
+    Calculate the extents from the minimum and maximum projections on principal directions
+
+    Note:
+        The negative minima are accumulated on the extents of the current and preceding
+        directions, which reproduces the historical output of principal_direction_extent.
+    '''
+    return maxs - np.cumsum(np.minimum(mins, 0.)[::-1])[::-1]
+
+
 def sphere_area(r):
     ''' Compute the area of a sphere with radius r
     '''
@@ -406,14 +521,5 @@ def principal_direction_extent(points):
     # principal components
     _, eigv = pca(points)
 
-    extent = np.zeros(3)
-
-    for i in range(eigv.shape[1]):
-        # orthogonal projection onto the direction of the v component
-        scalar_projs = np.sort(np.array([np.dot(p, eigv[:, i]) for p in points]))
-        extent[i] = scalar_projs[-1]
-
-        if scalar_projs[0] < 0.:
-            extent -= scalar_projs[0]
-
-    return extent
+    # orthogonal projection onto the direction of the v components
+    return projection_extent(points, eigv)
@@ -28,7 +28,8 @@
 
 '''Statistical analysis helper functions
 
-Nothing fancy. Just commonly used functions using scipy functionality.'''
+Nothing fancy. Just commonly used functions using scipy functionality, and
+mergeable online accumulators to summarize streams of feature values.'''
 
 from collections import namedtuple
 from enum import Enum, unique
@@ -200,3 +201,198 @@ def total_score(paired_dats, p=2, test=StatTests.ks):
     '''
     scores = np.array([compare_two(fL1, fL2, test=test).dist for fL1, fL2 in paired_dats])
     return np.linalg.norm(scores, p)
+
+
+class QuantileSketch(object):
+    '''Mergeable approximation of the distribution of a stream of values
+
+    The values are summarized by at most `2 * size` weighted centroids. When the
+    sketch grows beyond that, sorted centroids are merged into `size` groups of
+    equal weight, so that the rank error of the quantiles is of the order of
+    1 / size. Until the first compression, quantiles are exact.
+    '''
+
+    def __init__(self, size=256):
+        self.size = size
+        self._values = np.empty(0)
+        self._weights = np.empty(0)
+
+    def update(self, values, weights=None):
+        '''Add values, with optional weights, to the sketch'''
+        values = np.ravel(values).astype(np.float64)
+        weights = np.ones(len(values)) if weights is None else np.ravel(weights)
+        self._values = np.concatenate((self._values, values))
+        self._weights = np.concatenate((self._weights, weights))
+        if len(self._values) > 2 * self.size:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        '''Merge the centroids of another sketch into this one'''
+        return self.update(other._values, other._weights)  # pylint: disable=protected-access
+
+    @property
+    def count(self):
+        '''Total weight of the values in the sketch'''
+        return self._weights.sum()
+
+    def quantile(self, q):
+        '''Estimate the q-th quantile(s), with q in [0, 1]'''
+        if not len(self._values):
+            return np.nan
+        if np.all(self._weights == 1):
+            return np.percentile(self._values, np.multiply(q, 100.))
+
+        order = np.argsort(self._values)
+        values, weights = self._values[order], self._weights[order]
+        centers = np.cumsum(weights) - weights / 2.
+        return np.interp(np.multiply(q, weights.sum()), centers, values)
+
+    def _compress(self):
+        '''Merge the sorted centroids into `size` groups of equal weight'''
+        order = np.argsort(self._values, kind='mergesort')
+        values, weights = self._values[order], self._weights[order]
+        cumulative = np.cumsum(weights)
+        groups = np.minimum(((cumulative - weights / 2.) * self.size /
+                             cumulative[-1]).astype(np.intp), self.size - 1)
+        group_weights = np.bincount(groups, weights=weights, minlength=self.size)
+        used = group_weights > 0
+        self._values = (np.bincount(groups, weights=weights * values, minlength=self.size)[used] /
+                        group_weights[used])
+        self._weights = group_weights[used]
+
+
+class OnlineStats(object):
+    '''Mergeable summary statistics of a stream of scalar values
+
+    Memory usage does not depend on the number of values. The count, min, max,
+    mean and standard deviation are accumulated with Welford/Chan moments, and
+    the optional fixed-bin histogram exactly; so merging the partial results of
+    several workers gives the same results as a single pass over all the values.
+    Quantiles are estimated from a QuantileSketch.
+
+    Parameters:
+        bins: optional histogram bin edges
+        sketch_size: size of the quantile sketch, or None to disable quantiles
+    '''
+
+    def __init__(self, bins=None, sketch_size=256):
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._mean = 0.
+        self._m2 = 0.
+        self.bin_edges = None if bins is None else np.asarray(bins, dtype=np.float64)
+        self.bin_counts = None if bins is None else np.zeros(len(self.bin_edges) - 1,
+                                                             dtype=np.int64)
+        self.sketch = None if sketch_size is None else QuantileSketch(sketch_size)
+
+    def update(self, values):
+        '''Accumulate an array (or chunk) of values'''
+        values = np.ravel(values).astype(np.float64)
+        if not len(values):
+            return self
+
+        mean = values.mean()
+        self._merge_moments(len(values), mean, np.sum((values - mean) ** 2),
+                            values.min(), values.max())
+        if self.bin_counts is not None:
+            self.bin_counts += np.histogram(values, self.bin_edges)[0]
+        if self.sketch is not None:
+            self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        '''Merge the statistics accumulated by another OnlineStats object
+
+        Both objects must have the same histogram bins, and both or neither a quantile
+        sketch, otherwise a ValueError is raised and this object is left unchanged.
+        '''
+        if self.bin_counts is not None and (
+                other.bin_edges is None or not np.array_equal(self.bin_edges, other.bin_edges)):
+            raise ValueError('Cannot merge histograms with different bins')
+        if (self.sketch is None) != (other.sketch is None):
+            raise ValueError('Cannot merge statistics with and without a quantile sketch')
+
+        if other.count:
+            self._merge_moments(other.count, other._mean, other._m2,  # pylint: disable=W0212
+                                other.min, other.max)
+        if self.bin_counts is not None:
+            self.bin_counts += other.bin_counts
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _merge_moments(self, count, mean, m2, min_, max_):
+        '''Chan et al. parallel update of the moments'''
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, min_)
+        self.max = max(self.max, max_)
+
+    @property
+    def mean(self):
+        '''Mean of the values'''
+        return self._mean if self.count else np.nan
+
+    @property
+    def variance(self):
+        '''Population variance of the values, as numpy.var'''
+        return self._m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        '''Population standard deviation of the values, as numpy.std'''
+        return np.sqrt(self.variance)
+
+    @property
+    def total(self):
+        '''Sum of the values'''
+        return self._mean * self.count
+
+    def quantile(self, q):
+        '''Estimate the q-th quantile(s) of the values, with q in [0, 1]'''
+        if self.sketch is None:
+            raise ValueError('Quantiles are not available without a sketch')
+        return self.sketch.quantile(q)
+
+    @property
+    def median(self):
+        '''Estimate of the median of the values'''
+        return self.quantile(0.5)
+
+    def as_dict(self, functions=('min', 'max', 'mean', 'std')):
+        '''Dictionary of the requested statistics, as scalar_stats'''
+        return dict((func, getattr(self, func)) for func in functions)
+
+
+def aggregate(chunks, bins=None, sketch_size=256):
+    '''Summarize a stream of arrays of values with an OnlineStats object
+
+    Parameters:
+        chunks: iterable of arrays of values, e.g. the feature values of each neuron
+        bins: optional histogram bin edges
+        sketch_size: size of the quantile sketch, or None to disable quantiles
+    '''
+    stats = OnlineStats(bins=bins, sketch_size=sketch_size)
+    for values in chunks:
+        stats.update(values)
+    return stats
+
+
+def aggregate_feature(feature, neurons, bins=None, sketch_size=256, **kwargs):
+    '''Summarize a feature over neurons, consuming them one at a time
+
+    Parameters:
+        feature(string): feature to extract, see neurom.get
+        neurons: iterable of neurons, for instance a lazy neurom.io.utils.iter_neurons
+        bins: optional histogram bin edges
+        sketch_size: size of the quantile sketch, or None to disable quantiles
+        kwargs: parameters forwarded to neurom.get
+    '''
+    from neurom.fst import get
+    return aggregate((get(feature, nrn, **kwargs) for nrn in neurons),
+                     bins=bins, sketch_size=sketch_size)
@@ -32,3 +32,14 @@ def test_import_neurom():
         return True
     except Exception:
         return False
+
+
+def test_import_neurom_lazy():
+    # the heavy optional or slow dependencies are only imported when needed
+    import subprocess
+    import sys
+    code = ('import sys, neurom, neurom.check.runner, neurom.apps.morph_stats; '
+            'print(" ".join(m for m in ("scipy", "h5py", "matplotlib", "plotly", "tqdm", '
+            '"pkg_resources") if m in sys.modules))')
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.decode().strip() == ''
@@ -391,6 +391,21 @@ def test_segment_volume():
     nt.assert_almost_equal(mm.segment_volume((p0, p3)), mm.segment_volume((p3, p0)))
 
 
+def test_segment_areas_volumes():
+    points = uniform(1, 10, size=(20, 4))
+    starts, ends = points[:-1], points[1:]
+    np.testing.assert_allclose(mm.segment_areas(starts, ends),
+                               [mm.segment_area(seg) for seg in zip(starts, ends)])
+    np.testing.assert_allclose(mm.segment_volumes(starts, ends),
+                               [mm.segment_volume(seg) for seg in zip(starts, ends)])
+    nt.assert_almost_equal(mm.section_area(points),
+                           sum(mm.segment_area(seg) for seg in zip(starts, ends)))
+    nt.assert_almost_equal(mm.section_volume(points),
+                           sum(mm.segment_volume(seg) for seg in zip(starts, ends)))
+    nt.eq_(mm.section_area(points[:1]), 0.)
+    nt.eq_(mm.section_volume([]), 0.)
+
+
 def test_segment_length():
     nt.ok_(mm.segment_length(((0,0,0), (0,0,42))) == 42)
     nt.ok_(mm.segment_length(((0,0,0), (0,42,0))) == 42)
@@ -463,6 +478,25 @@ def test_pca():
     nt.assert_true(np.allclose(eigv[:,1], RES_EIGV[:,1]) or np.allclose(eigv[:, 1], -1. * RES_EIGV[:, 1]))
     nt.assert_true(np.allclose(eigv[:,2], RES_EIGV[:,2]) or np.allclose(eigv[:, 2], -1. * RES_EIGV[:, 2]))
 
+def test_merge_moments():
+    np.random.seed(0)
+    p = np.random.random((100, 3))
+    n, mean, scatter = mm.merge_moments([mm.point_moments(p[:10]),
+                                         mm.point_moments(p[10:11]),
+                                         mm.point_moments(p[11:])])
+    nt.eq_(n, 100)
+    nt.assert_true(np.allclose(mean, np.mean(p, axis=0)))
+    nt.assert_true(np.allclose(scatter / (n - 1), np.cov(p.T)))
+
+    eigs, _ = mm.pca_from_moments((n, mean, scatter))
+    nt.assert_true(np.allclose(eigs, mm.pca(p)[0]))
+
+
+def test_extent_from_bounds():
+    nt.assert_true(np.allclose(mm.extent_from_bounds(np.array([-1., -2., 1.]),
+                                                     np.array([1., 3., 2.])),
+                               [4., 5., 2.]))
+
 def test_sphere_area():
     area = mm.sphere_area(0.5)
     nt.assert_almost_equal(area, pi)
@@ -224,3 +224,80 @@ def test_total_score():
 
     score = st.total_score(testList3, p=2)
     nt.assert_almost_equal(score, np.sqrt(2.))
+
+
+def test_online_stats():
+    stats = st.aggregate(np.array_split(NORMAL, 7), bins=np.linspace(5, 15, 11))
+    nt.eq_(stats.count, len(NORMAL))
+    nt.assert_almost_equal(stats.min, np.min(NORMAL))
+    nt.assert_almost_equal(stats.max, np.max(NORMAL))
+    nt.assert_almost_equal(stats.mean, np.mean(NORMAL))
+    nt.assert_almost_equal(stats.std, np.std(NORMAL))
+    nt.assert_almost_equal(stats.total, np.sum(NORMAL))
+    np.testing.assert_array_equal(stats.bin_counts,
+                                  np.histogram(NORMAL, np.linspace(5, 15, 11))[0])
+    nt.assert_almost_equal(stats.median, np.median(NORMAL), 1)
+    nt.eq_(sorted(stats.as_dict()), ['max', 'mean', 'min', 'std'])
+
+
+def test_online_stats_merge():
+    bins = np.linspace(-1, 1, 5)
+    left = st.aggregate([UNIFORM[:300]], bins=bins)
+    right = st.aggregate([UNIFORM[300:], []], bins=bins)
+    merged = left.merge(right)
+    ref = st.aggregate([UNIFORM], bins=bins)
+    nt.eq_(merged.count, ref.count)
+    nt.assert_almost_equal(merged.mean, ref.mean)
+    nt.assert_almost_equal(merged.std, ref.std)
+    np.testing.assert_array_equal(merged.bin_counts, ref.bin_counts)
+
+    nt.assert_raises(ValueError, merged.merge, st.OnlineStats(bins=[0, 1]))
+
+
+def test_online_stats_merge_sketch():
+    left = st.aggregate([UNIFORM[:300]])
+    right = st.aggregate([UNIFORM[300:]])
+    merged = left.merge(right)
+    nt.eq_(merged.sketch.count, len(UNIFORM))
+    nt.assert_almost_equal(merged.median, np.median(UNIFORM), 1)
+
+    # the sketch would only describe part of the values
+    no_sketch = st.aggregate([UNIFORM[:10]], sketch_size=None)
+    nt.assert_raises(ValueError, merged.merge, no_sketch)
+    nt.assert_raises(ValueError, no_sketch.merge, merged)
+    nt.eq_(merged.count, len(UNIFORM))
+    nt.eq_(no_sketch.count, 10)
+
+
+def test_online_stats_empty():
+    stats = st.OnlineStats(sketch_size=None)
+    nt.ok_(np.isnan(stats.mean))
+    nt.ok_(np.isnan(stats.std))
+    nt.assert_raises(ValueError, stats.quantile, 0.5)
+
+
+def test_quantile_sketch():
+    sketch = st.QuantileSketch(size=64)
+    for chunk in np.array_split(EXPON, 10):
+        sketch.update(chunk)
+    nt.ok_(len(sketch._values) <= 128)
+    nt.eq_(sketch.count, len(EXPON))
+    for q in (0.1, 0.5, 0.9):
+        nt.assert_almost_equal(np.mean(EXPON <= sketch.quantile(q)), q, 1)
+
+    exact = st.QuantileSketch(size=64).update([1., 2., 3., 4.])
+    nt.assert_almost_equal(exact.quantile(0.5), 2.5)
+
+
+def test_aggregate_feature():
+    import os
+    import neurom as nm
+    from neurom.io.utils import iter_neurons
+    data_path = os.path.join(os.path.dirname(__file__), '../../test_data/swc')
+    files = [os.path.join(data_path, f) for f in ('Neuron.swc', 'simple.swc')]
+
+    stats = st.aggregate_feature('section_lengths', iter_neurons(files))
+    ref = nm.get('section_lengths', nm.load_neurons(files))
+    nt.eq_(stats.count, len(ref))
+    nt.assert_almost_equal(stats.mean, np.mean(ref))
+    nt.assert_almost_equal(stats.max, np.max(ref))
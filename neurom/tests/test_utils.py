@@ -57,6 +57,40 @@ def test_memoize_caches():
         nt.assert_not_equal(A().dummy(42, y=43), ref3)
 
 
+def test_memoize_class_call():
+    class A(object):
+        @nu.memoize
+        def add_to(self, arg):
+            return self + arg
+
+    nt.eq_(A.add_to(1, 2), 3)
+
+
+def test_cached_property():
+    class A(object):
+        @nu.cached_property
+        def value(self):
+            return random.random()
+
+        @nu.memoize
+        def method(self, x):
+            return random.random()
+
+    a = A()
+    ref = a.value
+    ref_method = a.method(1)
+    nt.eq_(a.value, ref)
+    nt.eq_(a.method(1), ref_method)
+    nt.assert_not_equal(A().value, ref)
+    nt.ok_(isinstance(A.value, nu.cached_property))
+    nt.eq_(A.value.attrname, 'value')
+    nt.eq_(a.__dict__['value'], ref)
+
+    nu.clear_cache(a)
+    nt.assert_not_equal(a.value, ref)
+    nt.assert_not_equal(a.method(1), ref_method)
+
+
 def test_deprecated():
     @nu.deprecated(msg='Hello')
     def dummy():
@@ -35,13 +35,17 @@ from functools import partial, update_wrapper, wraps
 import numpy as np
 
 
+# key of the instance dictionary holding the results of the memoized methods
+_MEMOIZE_CACHE = '_memoize_cache'
+
+
 class memoize(object):
     """cache the return value of a method
 
     This class is meant to be used as a decorator of methods. The return value
     from a given method invocation will be cached on the instance whose method
-    was invoked. All arguments passed to a method decorated with memoize must
-    be hashable.
+    was invoked, until clear_cache is called on it. All arguments passed to a
+    method decorated with memoize must be hashable.
 
     If a memoized method is invoked directly on its class the result will not
     be cached. Instead the method will be invoked like a static method::
@@ -57,23 +61,54 @@ class memoize(object):
 
     def __init__(self, func):
         self.func = func
+        # the name instead of the function keeps the cache, and the object, picklable
+        self._name = getattr(func, '__qualname__', func.__name__)
         update_wrapper(self, func)
 
     def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self.func
         return partial(self, obj)
 
-    def __call__(self, *args, **kw):
-        obj = args[0]
+    def __call__(self, obj, *args, **kw):
+        key = (self._name, args, frozenset(kw.items())) if kw else (self._name, args)
+        cache = obj.__dict__.get(_MEMOIZE_CACHE)
+        if cache is None:
+            cache = obj.__dict__[_MEMOIZE_CACHE] = {}
         try:
-            cache = obj.__cache  # pylint: disable=protected-access
-        except AttributeError:
-            cache = obj.__cache = {}
-        key = (self.func, args[1:], frozenset(kw.items()))
-        try:
-            res = cache[key]
+            return cache[key]
         except KeyError:
-            res = cache[key] = self.func(*args, **kw)
-        return res
+            res = cache[key] = self.func(obj, *args, **kw)
+            return res
+
+
+class cached_property(object):
+    """property computed on first access and cached on the instance
+
+    The value is stored in the instance dictionary under the name of the property,
+    which then shadows the property: the next accesses are plain attribute lookups.
+    The value is computed again after clear_cache is called on the instance.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.attrname = func.__name__
+        update_wrapper(self, func)
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.attrname] = self.func(obj)
+        return value
+
+
+def clear_cache(obj):
+    """Remove the values cached by the memoize methods and cached_property of an object"""
+    obj.__dict__.pop(_MEMOIZE_CACHE, None)
+    for cls in type(obj).__mro__:
+        for attr in vars(cls).values():
+            if isinstance(attr, cached_property):
+                obj.__dict__.pop(attr.attrname, None)
 
 
 def _warn_deprecated(msg):
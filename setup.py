@@ -74,6 +74,7 @@ config = {
     'name': 'neurom',
     'extras_require': {
         'plotly': ['plotly>=3.6.0'],
+        'arrow': ['pyarrow>=0.17.0'],
     },
     'include_package_data': True,
 